@@ -24,8 +24,8 @@ config = context.config
 if "DATABASE_URL" in os.environ:
     config.set_main_option("sqlalchemy.url", os.environ["DATABASE_URL"])
 
-# Logging setup
-if config.config_file_name is not None:
+# Logging setup (skipped when invoked from the app, which owns logging)
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 target_metadata = Base.metadata
@@ -44,6 +44,11 @@ def run_migrations_offline() -> None:
 
 def do_run_migrations(connection: Connection) -> None:
     """Run actual migrations."""
+    # Fail fast instead of queueing behind long-running transactions; the
+    # setting is session-level so it also covers autocommit blocks.
+    if connection.dialect.name == "postgresql":
+        lock_timeout = os.environ.get("MIGRATION_LOCK_TIMEOUT", "5s")
+        connection.exec_driver_sql(f"SET lock_timeout = '{lock_timeout}'")
     context.configure(
         connection=connection,
         target_metadata=target_metadata,
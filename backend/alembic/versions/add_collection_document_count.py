@@ -0,0 +1,36 @@
+"""add collections.document_count
+
+Revision ID: add_collection_document_count
+Revises: add_collection_name_unique
+Create Date: 2026-10-16 09:20:00.000000
+
+Denormalized document count, maintained by the upload and delete paths.
+Backfilled here from the documents table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_collection_document_count'
+down_revision: Union[str, Sequence[str], None] = 'add_collection_name_unique'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add document_count and backfill it."""
+    op.add_column('collections', sa.Column('document_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute("""
+        UPDATE collections
+        SET document_count = (
+            SELECT count(*) FROM documents d WHERE d.collection_id = collections.id
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Drop document_count."""
+    op.drop_column('collections', 'document_count')
@@ -0,0 +1,38 @@
+"""unique collection name per user
+
+Revision ID: add_collection_name_unique
+Revises: add_user_settings
+Create Date: 2026-10-16 09:10:00.000000
+
+Existing duplicates are renamed, keeping the oldest collection's name and
+suffixing the others with their id, so no rows are dropped.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_collection_name_unique'
+down_revision: Union[str, Sequence[str], None] = 'add_user_settings'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Rename duplicate (user_id, name) collections, then add the constraint."""
+    op.execute("""
+        UPDATE collections c
+        SET name = left(c.name, 240) || ' (' || c.id || ')'
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY user_id, name ORDER BY id) AS rn
+            FROM collections
+        ) d
+        WHERE c.id = d.id AND d.rn > 1
+    """)
+    op.create_unique_constraint('uq_collection_user_name', 'collections', ['user_id', 'name'])
+
+
+def downgrade() -> None:
+    """Drop the constraint; renamed collections keep their new names."""
+    op.drop_constraint('uq_collection_user_name', 'collections', type_='unique')
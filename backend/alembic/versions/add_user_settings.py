@@ -0,0 +1,39 @@
+"""add user_settings table
+
+Revision ID: add_user_settings
+Revises: consolidated_final
+Create Date: 2026-10-16 09:00:00.000000
+
+Per-user AI defaults, previously held in a process-local dict.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_user_settings'
+down_revision: Union[str, Sequence[str], None] = 'consolidated_final'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the user_settings table."""
+    op.create_table('user_settings',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('llm_model', sa.String(length=100), nullable=False, server_default='ollama_cloud'),
+        sa.Column('embedding_model', sa.String(length=255), nullable=False, server_default='text-embedding-3-small'),
+        sa.Column('temperature', sa.Integer(), nullable=False, server_default='7'),
+        sa.Column('max_tokens', sa.Integer(), nullable=False, server_default='2000'),
+        sa.Column('top_k', sa.Integer(), nullable=False, server_default='5'),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], deferrable=True, initially='IMMEDIATE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Drop the user_settings table."""
+    op.drop_table('user_settings')
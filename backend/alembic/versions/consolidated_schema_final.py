@@ -20,6 +20,32 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+# (name, table, columns, unique, method) for every index created by this migration.
+# Primary keys already have their own btree, so no separate ix_*_id indexes.
+_INDEXES = [
+    ('ix_users_email', 'users', ['email'], True, 'btree'),
+    ('ix_collections_name', 'collections', ['name'], False, 'btree'),
+    ('ix_collections_subject', 'collections', ['subject'], False, 'btree'),
+    ('ix_collections_author', 'collections', ['author'], False, 'btree'),
+    # Serves list_sessions: WHERE user_id = ? ORDER BY updated_at DESC
+    ('ix_chat_sessions_user_updated', 'chat_sessions', ['user_id', sa.text('updated_at DESC')], False, 'btree'),
+    ('ix_documents_title', 'documents', ['title'], False, 'btree'),
+    # Serves document listing filtered by collection and status
+    ('ix_documents_collection_status', 'documents', ['collection_id', 'status'], False, 'btree'),
+    # messages indexes are in _MESSAGES_INDEXES: CONCURRENTLY is not
+    # supported on partitioned tables
+]
+
+MESSAGES_PARTITIONS = 16
+
+# (name, columns, method), declared on the partitioned parent so each partition
+# gets its own local index
+_MESSAGES_INDEXES = [
+    # Serves get_messages: WHERE session_id = ? ORDER BY created_at
+    ('ix_messages_session_created', ['session_id', 'created_at'], 'btree'),
+]
+
+
 def upgrade() -> None:
     """Create complete database schema with all features."""
 
@@ -33,8 +59,6 @@ def upgrade() -> None:
         sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
-    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
 
     # Create collections table
     op.create_table('collections',
@@ -48,13 +72,9 @@ def upgrade() -> None:
         sa.Column('author', sa.String(length=500), nullable=True),
         sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
         sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
-        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], deferrable=True, initially='IMMEDIATE'),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_collections_id'), 'collections', ['id'], unique=False)
-    op.create_index(op.f('ix_collections_name'), 'collections', ['name'], unique=False)
-    op.create_index(op.f('ix_collections_subject'), 'collections', ['subject'], unique=False)
-    op.create_index(op.f('ix_collections_author'), 'collections', ['author'], unique=False)
 
     # Create chat_sessions table (with AI settings and voice included)
     op.create_table('chat_sessions',
@@ -76,11 +96,10 @@ def upgrade() -> None:
         sa.Column('voice', sa.String(length=100), nullable=True),
         sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
         sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
-        sa.ForeignKeyConstraint(['collection_id'], ['collections.id'], ),
-        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['collection_id'], ['collections.id'], deferrable=True, initially='IMMEDIATE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], deferrable=True, initially='IMMEDIATE'),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_chat_sessions_id'), 'chat_sessions', ['id'], unique=False)
 
     # Create documents table
     op.create_table('documents',
@@ -98,16 +117,16 @@ def upgrade() -> None:
         sa.Column('doc_metadata', sa.JSON(), nullable=True),
         sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
         sa.Column('processed_at', sa.DateTime(), nullable=True),
-        sa.ForeignKeyConstraint(['collection_id'], ['collections.id'], ),
-        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['collection_id'], ['collections.id'], deferrable=True, initially='IMMEDIATE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], deferrable=True, initially='IMMEDIATE'),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_documents_id'), 'documents', ['id'], unique=False)
-    op.create_index(op.f('ix_documents_title'), 'documents', ['title'], unique=False)
 
-    # Create messages table (with audio and translation columns included)
+    # Create messages table (with audio and translation columns included),
+    # hash-partitioned on session_id so per-session reads touch one partition.
+    # The partition key must be part of the primary key.
     op.create_table('messages',
-        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
         sa.Column('session_id', sa.Integer(), nullable=False),
         sa.Column('role', sa.String(length=50), nullable=False),
         sa.Column('content', sa.Text(), nullable=False),
@@ -117,26 +136,37 @@ def upgrade() -> None:
         sa.Column('audio_url', sa.String(length=500), nullable=True),
         sa.Column('translated_content', sa.Text(), nullable=True),
         sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
-        sa.ForeignKeyConstraint(['session_id'], ['chat_sessions.id'], ),
-        sa.PrimaryKeyConstraint('id')
+        sa.ForeignKeyConstraint(['session_id'], ['chat_sessions.id'], deferrable=True, initially='IMMEDIATE'),
+        sa.PrimaryKeyConstraint('id', 'session_id'),
+        postgresql_partition_by='HASH (session_id)'
     )
-    op.create_index(op.f('ix_messages_id'), 'messages', ['id'], unique=False)
+    for i in range(MESSAGES_PARTITIONS):
+        op.execute(
+            f"CREATE TABLE messages_p{i} PARTITION OF messages "
+            f"FOR VALUES WITH (MODULUS {MESSAGES_PARTITIONS}, REMAINDER {i})"
+        )
+    for name, columns, using in _MESSAGES_INDEXES:
+        op.create_index(name, 'messages', columns, unique=False, postgresql_using=using)
+
+    # Build indexes outside the DDL transaction with CREATE INDEX CONCURRENTLY
+    # so re-running this on a live database never takes a write-blocking lock.
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique, using in _INDEXES:
+            op.create_index(
+                name, table, columns, unique=unique, postgresql_using=using,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
 
 
 def downgrade() -> None:
     """Drop all tables."""
-    op.drop_index(op.f('ix_messages_id'), table_name='messages')
+    with op.get_context().autocommit_block():
+        for name, table, _, _, _ in reversed(_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    # Dropping the parent drops its partitions and their indexes
     op.drop_table('messages')
-    op.drop_index(op.f('ix_documents_title'), table_name='documents')
-    op.drop_index(op.f('ix_documents_id'), table_name='documents')
     op.drop_table('documents')
-    op.drop_index(op.f('ix_chat_sessions_id'), table_name='chat_sessions')
     op.drop_table('chat_sessions')
-    op.drop_index(op.f('ix_collections_author'), table_name='collections')
-    op.drop_index(op.f('ix_collections_subject'), table_name='collections')
-    op.drop_index(op.f('ix_collections_name'), table_name='collections')
-    op.drop_index(op.f('ix_collections_id'), table_name='collections')
     op.drop_table('collections')
-    op.drop_index(op.f('ix_users_id'), table_name='users')
-    op.drop_index(op.f('ix_users_email'), table_name='users')
     op.drop_table('users')
\ No newline at end of file
@@ -1,13 +1,12 @@
-from sqlalchemy import select
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from jose import JWTError
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.domain.schemas.user import UserCreate, UserLogin, TokenWithUser, UserResponse
 from app.services.auth_service import authenticate_user, create_user, create_tokens
 from app.infra.database import get_db
 from app.core.security import decode_token
-from app.infra.redis import is_refresh_token_valid
 from app.domain.schemas.user import TokenPayload
 from app.infra import User
 from app.api.v1.deps import CurrentUser
@@ -18,12 +17,12 @@ DBSession = Annotated[AsyncSession, Depends(get_db)]
 
 @router.post("/register", status_code=status.HTTP_201_CREATED, response_model=TokenWithUser)
 async def register(user_in: Annotated[UserCreate, Body(...)], db: DBSession):
-    existing = await db.execute(
-        select(User).where(User.email == user_in.email)
-    )
-    if existing.scalar_one_or_none():
+    # The unique index on users.email does the duplicate check in the INSERT itself
+    try:
+        user = await create_user(db, user_in)
+    except IntegrityError:
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Email already registered")
-    user = await create_user(db, user_in)
     return await create_tokens(user.id, db)
 
 @router.post("/login", response_model=TokenWithUser)
@@ -45,11 +44,11 @@ async def refresh_token(refresh_token: Annotated[str, Body(embed=True)], db: DBS
 
     user_id = int(token_data.sub)
     jti = payload.get("jti")
-    if not jti or not await is_refresh_token_valid(user_id, jti):
+    if not jti:
         raise HTTPException(status_code=401, detail="Refresh token revoked or expired")
 
-    # Optional: invalidate old refresh token here for single-session
-    return await create_tokens(user_id, db)
+    # Validates and rotates the refresh token in a single Redis call
+    return await create_tokens(user_id, db, rotate_jti=jti)
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user(current_user: CurrentUser):
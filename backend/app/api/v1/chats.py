@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 from typing import List, Optional
+import logging
 
 from app.infra.database import get_db
 from app.infra import User, Message, Collection
@@ -9,8 +10,11 @@ from app.infra.chat import ChatSession
 from app.api.v1.deps import get_current_user
 from app.services.chat_service import ChatService
 from app.services.service_manager import get_chat_service
+from app.core.constants import LLMConstants
 from app.infra.chat import ChatSession
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["chat"])
 
 # Pydantic models
@@ -21,9 +25,12 @@ from app.domain.schemas.chat import (
     SessionResponse,
     MessageResponse
 )
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from typing import Optional
 
+_sessions_adapter = TypeAdapter(List[SessionResponse])
+_messages_adapter = TypeAdapter(List[MessageResponse])
+
 class UpdateAISettingsRequest(BaseModel):
     system_prompt: Optional[str] = None
     custom_instructions: Optional[str] = None
@@ -83,18 +90,14 @@ async def create_session(
         prompt_template=request.prompt_template,
         ai_personality=request.ai_personality,
         response_style=request.response_style,
-        voice=getattr(request, 'voice', None)
+        voice=request.voice
     )
-    
-    # Load collection for response
-    result = await db.execute(select(Collection).where(Collection.id == session.collection_id))
-    collection = result.scalar_one_or_none()
-    
+
     return SessionResponse(
         id=session.id,
         title=session.title,
         collection_id=session.collection_id,
-        collection_name=collection.name if collection else "Unknown",
+        collection_name=session.collection.name,
         llm_model=session.llm_model,
         temperature=session.temperature,
         max_tokens=session.max_tokens,
@@ -121,27 +124,10 @@ async def list_sessions(
         db=db
     )
     
-    return [
-        SessionResponse(
-            id=s.id,
-            title=s.title,
-            collection_id=s.collection_id,
-            collection_name=s.collection.name if s.collection else "Unknown",
-            llm_model=s.llm_model,
-            temperature=s.temperature,
-            max_tokens=s.max_tokens,
-            top_k=s.top_k,
-            created_at=s.created_at,
-            updated_at=s.updated_at,
-            system_prompt=s.system_prompt,
-            custom_instructions=s.custom_instructions,
-            prompt_template=s.prompt_template,
-            ai_personality=s.ai_personality,
-            response_style=s.response_style,
-            voice=s.voice
-        )
-        for s in sessions
-    ]
+    # Validate and serialize in one pass in pydantic-core; returning a Response
+    # skips FastAPI's second validation against response_model
+    sessions = _sessions_adapter.validate_python([row._mapping for row in sessions])
+    return Response(content=_sessions_adapter.dump_json(sessions), media_type="application/json")
 
 @router.get("/sessions/{session_id}/messages", response_model=List[MessageResponse])
 async def get_messages(
@@ -157,19 +143,8 @@ async def get_messages(
         db=db
     )
     
-    return [
-        MessageResponse(
-            id=m.id,
-            role=m.role,
-            content=m.content,
-            sources=m.sources,
-            llm_used=m.llm_used,
-            created_at=m.created_at,
-            audio_url=m.audio_url,
-            translated_content=m.translated_content
-        )
-        for m in messages
-    ]
+    messages = _messages_adapter.validate_python([row._mapping for row in messages])
+    return Response(content=_messages_adapter.dump_json(messages), media_type="application/json")
 
 @router.delete("/sessions/{session_id}")
 async def delete_session(
@@ -213,40 +188,27 @@ async def update_session_ai_settings(
     """Update AI settings for a specific chat session"""
     from app.core.validation import validate_llm_model, validate_temperature, validate_top_k
 
-    # Verify session ownership
+    values = {k: v for k, v in request.model_dump(exclude_unset=True).items() if v is not None}
+    if "llm_model" in values:
+        values["llm_model"] = validate_llm_model(values["llm_model"])
+    if "temperature" in values:
+        # Stored in tenths (0-20), the scale the sessions API returns to the UI;
+        # round to the nearest tenth rather than truncating (0.75 -> 8, not 7)
+        values["temperature"] = round(validate_temperature(values["temperature"]) * LLMConstants.TEMPERATURE_SCALE)
+    if "top_k" in values:
+        values["top_k"] = validate_top_k(values["top_k"])
+
+    # Single UPDATE scoped to the owner; no rows matched means no such session
     result = await db.execute(
-        select(ChatSession).where(
+        update(ChatSession)
+        .where(
             ChatSession.id == session_id,
             ChatSession.user_id == current_user.id
         )
+        .values(**values, updated_at=func.now())
     )
-    session = result.scalar_one_or_none()
-    if not session:
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Session not found")
-
-    # Update AI settings
-    if request.system_prompt is not None:
-        session.system_prompt = request.system_prompt
-    if request.custom_instructions is not None:
-        session.custom_instructions = request.custom_instructions
-    if request.prompt_template is not None:
-        session.prompt_template = request.prompt_template
-    if request.ai_personality is not None:
-        session.ai_personality = request.ai_personality
-    if request.response_style is not None:
-        session.response_style = request.response_style
-    if request.llm_model is not None:
-        session.llm_model = validate_llm_model(request.llm_model)
-    if request.temperature is not None:
-        session.temperature = int(validate_temperature(request.temperature) * 10)
-    if request.max_tokens is not None:
-        session.max_tokens = request.max_tokens  # Could add validation
-    if request.top_k is not None:
-        session.top_k = validate_top_k(request.top_k)
-    if request.voice is not None:
-        session.voice = request.voice
-
-    session.updated_at = func.now()
     await db.commit()
 
     return {"message": "AI settings updated successfully"}
@@ -259,22 +221,26 @@ async def generate_message_audio(
     chat_service: ChatService = Depends(get_chat_service)
 ):
     """Generate audio for a specific message on-demand"""
-    # Verify the message belongs to the current user
+    # Authorize and load the fields the service needs in one query
     result = await db.execute(
-        select(Message).join(ChatSession, Message.session_id == ChatSession.id).where(
+        select(Message.id, Message.content, ChatSession.voice)
+        .join(ChatSession, Message.session_id == ChatSession.id)
+        .where(
             Message.id == message_id,
             ChatSession.user_id == current_user.id
         )
     )
-    message = result.scalar_one_or_none()
+    message = result.one_or_none()
+    # End the read transaction so no connection is held through the slow call
+    await db.commit()
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
 
     try:
-        return await chat_service.generate_message_audio(message_id, db)
+        return await chat_service.generate_message_audio(
+            message_id, message.content, message.voice, db
+        )
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Failed to generate audio for message {message_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Audio generation failed: {str(e)}")
 
@@ -287,28 +253,34 @@ async def translate_message(
     chat_service: ChatService = Depends(get_chat_service)
 ):
     """Translate a specific message to Hindi on-demand"""
-    # Verify the message belongs to the current user
+    # Authorize and load the fields the service needs in one query
     result = await db.execute(
-        select(Message).join(ChatSession, Message.session_id == ChatSession.id).where(
+        select(Message.id, Message.content)
+        .join(ChatSession, Message.session_id == ChatSession.id)
+        .where(
             Message.id == message_id,
             ChatSession.user_id == current_user.id
         )
     )
-    message = result.scalar_one_or_none()
+    message = result.one_or_none()
+    # End the read transaction so no connection is held through the slow call
+    await db.commit()
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
 
     try:
-        return await chat_service.translate_message(message_id, target_lang, db)
+        return await chat_service.translate_message(
+            message_id, message.content, target_lang, db
+        )
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Failed to translate message {message_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Translation failed: {str(e)}")
 
 @router.get("/languages")
 async def get_available_languages(
+    response: Response,
     chat_service: ChatService = Depends(get_chat_service)
 ):
     """Get available translation languages"""
+    response.headers["Cache-Control"] = "public, max-age=3600"
     return await chat_service.get_available_languages()
@@ -1,12 +1,14 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func as sql_func
+from sqlalchemy import delete, select, func as sql_func
 from typing import List, Optional, Dict
-from datetime import datetime
 
 from app.infra.database import get_db
 from app.core.config import settings
 from app.infra import Collection, User, Document
+from app.infra.collection import recount_document_counts
 from app.api.v1.deps import get_current_user
 from app.domain.schemas.collections import CollectionCreate, CollectionResponse, CollectionStatsResponse
 
@@ -22,44 +24,28 @@ async def create_collection(
     current_user: User = Depends(get_current_user)
 ):
     """Create a new collection"""
-    # Check if collection already exists
-    result = await db.execute(
-        select(Collection).where(
-            Collection.name == request.name,
-            Collection.user_id == current_user.id
-        )
-    )
-    existing = result.scalar_one_or_none()
-    
-    if existing:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Collection '{request.name}' already exists"
-        )
-    
-    # Create collection
     collection = Collection(
         name=request.name,
         description=request.description,
         user_id=current_user.id
     )
     db.add(collection)
-    await db.commit()
-    await db.refresh(collection)
-    
-    # Get document count
-    doc_count_result = await db.execute(
-        select(sql_func.count(Document.id)).where(
-            Document.collection_id == collection.id
+    # uq_collection_user_name rejects duplicates atomically
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=f"Collection '{request.name}' already exists"
         )
-    )
-    doc_count = doc_count_result.scalar() or 0
+    await db.refresh(collection)
     
     return CollectionResponse(
         id=collection.id,
         name=collection.name,
         description=collection.description,
-        document_count=doc_count,
+        document_count=0,
         created_at=collection.created_at,
         updated_at=collection.updated_at
     )
@@ -75,27 +61,18 @@ async def list_collections(
         .where(Collection.user_id == current_user.id)
         .order_by(Collection.created_at.desc())
     )
-    collections = result.scalars().all()
     
-    response = []
-    for collection in collections:
-        doc_count_result = await db.execute(
-            select(sql_func.count(Document.id)).where(
-                Document.collection_id == collection.id
-            )
-        )
-        doc_count = doc_count_result.scalar() or 0
-        
-        response.append(CollectionResponse(
+    return [
+        CollectionResponse(
             id=collection.id,
             name=collection.name,
             description=collection.description,
-            document_count=doc_count,
+            document_count=collection.document_count,
             created_at=collection.created_at,
             updated_at=collection.updated_at
-        ))
-    
-    return response
+        )
+        for collection in result.scalars().all()
+    ]
 
 @router.get("/{collection_id}", response_model=CollectionResponse)
 async def get_collection(
@@ -115,18 +92,11 @@ async def get_collection(
     if not collection:
         raise HTTPException(status_code=404, detail="Collection not found")
     
-    doc_count_result = await db.execute(
-        select(sql_func.count(Document.id)).where(
-            Document.collection_id == collection.id
-        )
-    )
-    doc_count = doc_count_result.scalar() or 0
-    
     return CollectionResponse(
         id=collection.id,
         name=collection.name,
         description=collection.description,
-        document_count=doc_count,
+        document_count=collection.document_count,
         created_at=collection.created_at,
         updated_at=collection.updated_at
     )
@@ -139,46 +109,63 @@ async def get_collection_stats(
     vector_store: VectorStoreService = Depends(get_vector_store_service)
 ):
     """Get detailed collection statistics"""
+    # Ownership check, document count and chunk total in one round-trip
     result = await db.execute(
-        select(Collection).where(
+        select(
+            Collection.id,
+            Collection.name,
+            Collection.document_count,
+            sql_func.coalesce(sql_func.sum(Document.chunk_count), 0).label("total_chunks")
+        )
+        .outerjoin(Document, Document.collection_id == Collection.id)
+        .where(
             Collection.id == collection_id,
             Collection.user_id == current_user.id
         )
+        .group_by(Collection.id)
     )
-    collection = result.scalar_one_or_none()
+    stats = result.one_or_none()
     
-    if not collection:
+    if not stats:
         raise HTTPException(status_code=404, detail="Collection not found")
     
-    # Get document count
-    doc_count_result = await db.execute(
-        select(sql_func.count(Document.id)).where(
-            Document.collection_id == collection.id
-        )
-    )
-    doc_count = doc_count_result.scalar() or 0
-    
-    # Get total chunks
-    total_chunks_result = await db.execute(
-        select(sql_func.sum(Document.chunk_count)).where(
-            Document.collection_id == collection.id
-        )
-    )
-    total_chunks = total_chunks_result.scalar() or 0
-    
-    # Get Milvus stats
-    milvus_stats = vector_store.get_collection_stats(collection.name)
+    # Get Milvus stats (needs the collection name, so it can't overlap the query)
+    milvus_stats = await asyncio.to_thread(vector_store.get_collection_stats, stats.name)
     milvus_entities = milvus_stats.get("num_entities", 0) if milvus_stats.get("exists") else 0
     
     return CollectionStatsResponse(
-        id=collection.id,
-        name=collection.name,
-        document_count=doc_count,
-        total_chunks=int(total_chunks),
+        id=stats.id,
+        name=stats.name,
+        document_count=stats.document_count,
+        total_chunks=int(stats.total_chunks),
         milvus_entities=milvus_entities,
         status="active" if milvus_stats.get("exists") else "not_initialized"
     )
 
+@router.post("/{collection_id}/recount")
+async def recount_collection_documents(
+    collection_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Rebuild a collection's document_count from its documents"""
+    result = await db.execute(
+        select(Collection.id).where(
+            Collection.id == collection_id,
+            Collection.user_id == current_user.id
+        )
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    
+    await recount_document_counts(db, collection_id)
+    await db.commit()
+    
+    result = await db.execute(
+        select(Collection.document_count).where(Collection.id == collection_id)
+    )
+    return {"collection_id": collection_id, "document_count": result.scalar_one()}
+
 @router.get("/{collection_id}/visualize", response_model=Dict)
 async def get_collection_visualization(
     collection_id: int,
@@ -187,19 +174,20 @@ async def get_collection_visualization(
     vector_store: VectorStoreService = Depends(get_vector_store_service)
 ):
     """Get 3D visualization data for collection vectors"""
+    # Vectors come from Milvus; only the name is needed from the database
     result = await db.execute(
-        select(Collection).where(
+        select(Collection.name).where(
             Collection.id == collection_id,
             Collection.user_id == current_user.id
         )
     )
-    collection = result.scalar_one_or_none()
+    collection_name = result.scalar_one_or_none()
 
-    if not collection:
+    if collection_name is None:
         raise HTTPException(status_code=404, detail="Collection not found")
 
     # Get 3D visualization data
-    viz_data = vector_store.get_3d_visualization_data(collection.name)
+    viz_data = await asyncio.to_thread(vector_store.get_3d_visualization_data, collection_name)
 
     if "error" in viz_data:
         raise HTTPException(status_code=500, detail=viz_data["error"])
@@ -215,28 +203,46 @@ async def delete_collection(
     vector_store: VectorStoreService = Depends(get_vector_store_service)
 ):
     """Delete a collection"""
+    # Documents first (the ORM cascade used to do this), scoped to the owner
+    await db.execute(
+        delete(Document).where(
+            Document.collection_id.in_(
+                select(Collection.id).where(
+                    Collection.id == collection_id,
+                    Collection.user_id == current_user.id
+                )
+            )
+        )
+    )
     result = await db.execute(
-        select(Collection).where(
+        delete(Collection)
+        .where(
             Collection.id == collection_id,
             Collection.user_id == current_user.id
         )
+        .returning(Collection.name)
     )
-    collection = result.scalar_one_or_none()
+    collection_name = result.scalar_one_or_none()
     
-    if not collection:
+    if collection_name is None:
+        await db.rollback()
         raise HTTPException(status_code=404, detail="Collection not found")
     
-    # Delete from Milvus if requested
-    if delete_vectors:
-        try:
-            vector_store.delete_collection(collection.name)
-        except Exception as e:
-            # Log error but continue with database deletion
-            print(f"Error deleting Milvus collection: {e}")
+    if not delete_vectors:
+        await db.commit()
+        return {"message": "Collection deleted successfully"}
     
-    # Delete from database (cascade will delete documents)
-    await db.delete(collection)
-    await db.commit()
+    # Drop the Milvus collection while the database commit is in flight
+    vectors_result, commit_result = await asyncio.gather(
+        asyncio.to_thread(vector_store.delete_collection, collection_name),
+        db.commit(),
+        return_exceptions=True
+    )
+    if isinstance(vectors_result, Exception):
+        # Log error but don't fail the database deletion
+        print(f"Error deleting Milvus collection: {vectors_result}")
+    if isinstance(commit_result, Exception):
+        raise commit_result
     
     return {"message": "Collection deleted successfully"}
 
@@ -261,28 +267,18 @@ async def update_collection(
         raise HTTPException(status_code=404, detail="Collection not found")
     
     if name:
-        # Check if new name already exists
-        existing_result = await db.execute(
-            select(Collection).where(
-                Collection.name == name,
-                Collection.user_id == current_user.id,
-                Collection.id != collection_id
-            )
-        )
-        existing = existing_result.scalar_one_or_none()
-        
-        if existing:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Collection '{name}' already exists"
-            )
-        
         collection.name = name
     
     if description is not None:
         collection.description = description
     
-    collection.updated_at = datetime.utcnow()
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=f"Collection '{name}' already exists"
+        )
     
     return {"message": "Collection updated successfully"}
@@ -1,26 +1,43 @@
+import time
 from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.infra.database import get_db
 from app.core.security import decode_token
-from app.infra import User
-from app.infra.redis import is_refresh_token_valid
-from sqlalchemy import select
+from app.infra import User as UserModel
+from app.infra.redis import get_cached_user, cache_user
+from app.domain.models import User
 from app.domain.schemas.user import TokenPayload
+from cachetools import TTLCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# Per-worker L1 in front of the Redis identity cache: token -> (User, exp).
+# Repeat requests with the same token skip both JWT verification and Redis.
+_token_cache: TTLCache = TTLCache(maxsize=50_000, ttl=30)
+
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ) -> User:
+    """Resolve the bearer token to a detached User snapshot.
+
+    Verified tokens are memoized in-process for a few seconds, and the identity
+    is cached in Redis for the remaining token lifetime, so authenticated
+    requests normally skip both JWT verification and the users lookup.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    cached_token = _token_cache.get(token)
+    if cached_token and cached_token[1] > time.time():
+        return cached_token[0]
+
     try:
         payload = decode_token(token)
         token_data = TokenPayload(**payload)
@@ -29,9 +46,26 @@ async def get_current_user(
     except (JWTError, ValueError):
         raise credentials_exception
 
-    user = await db.get(User, int(token_data.sub))
-    if not user:
+    user_id = int(token_data.sub)
+    cached = await get_cached_user(user_id)
+    if cached:
+        user = User(**cached)
+        _token_cache[token] = (user, token_data.exp)
+        return user
+
+    # Only the identity columns; no ORM instance, so nothing can lazy-load
+    result = await db.execute(
+        select(UserModel.id, UserModel.email, UserModel.is_active).where(UserModel.id == user_id)
+    )
+    row = result.one_or_none()
+    if not row:
         raise credentials_exception
+
+    user = User(**row._mapping)
+    ttl = int(token_data.exp - time.time())
+    if ttl > 0:
+        await cache_user(user_id, {"id": user.id, "email": user.email, "is_active": user.is_active}, ttl)
+    _token_cache[token] = (user, token_data.exp)
     return user
 
-CurrentUser = Annotated[User, Depends(get_current_user)]
\ No newline at end of file
+CurrentUser = Annotated[User, Depends(get_current_user)]
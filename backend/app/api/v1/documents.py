@@ -1,14 +1,17 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, BackgroundTasks
+import asyncio
+import contextlib
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, BackgroundTasks, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, select, update, func as sql_func
 from typing import List, Optional, Dict
 from datetime import datetime
 from pathlib import Path
-import shutil
 import os
 import logging
+import aiofiles
+import aiofiles.os
 
-from app.infra.database import get_db
+from app.infra.database import get_db, deferred_constraints
 from app.core.config import settings
 from app.infra import Document, Collection, User
 from app.services.document_processor import DocumentProcessor
@@ -20,12 +23,42 @@ router = APIRouter(tags=["documents"])
 
 logger = logging.getLogger(__name__)
 
-from app.services.service_manager import get_vector_store_service
+from app.services.service_manager import get_vector_store_service, get_document_processor
 
-# Initialize document processor
-def get_document_processor(db: AsyncSession = Depends(get_db)) -> DocumentProcessor:
-    vector_store_service = get_vector_store_service()
-    return DocumentProcessor(settings, vector_store_service, db)
+def _try_unlink(path: str) -> None:
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1MB
+
+async def _save_upload(file: UploadFile, file_path: Path, keep_bytes: bool = False) -> tuple[int, Optional[bytes]]:
+    """Stream an upload to disk without blocking the event loop.
+
+    Rejects the file as soon as it exceeds MAX_FILE_SIZE instead of measuring it first.
+    Returns the size and, when keep_bytes is set and the file is within
+    INLINE_UPLOAD_THRESHOLD, the content so the processor needn't re-read it.
+    """
+    file_size = 0
+    chunks: Optional[List[bytes]] = [] if keep_bytes else None
+    async with aiofiles.open(file_path, "wb") as buffer:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            file_size += len(chunk)
+            if file_size > settings.MAX_FILE_SIZE:
+                break
+            await buffer.write(chunk)
+            if chunks is not None:
+                if file_size > settings.INLINE_UPLOAD_THRESHOLD:
+                    chunks = None
+                else:
+                    chunks.append(chunk)
+
+    if file_size > settings.MAX_FILE_SIZE:
+        await aiofiles.os.remove(file_path)
+        raise HTTPException(
+            status_code=400,
+            detail=f"File {file.filename} exceeds maximum size of {settings.MAX_FILE_SIZE} bytes"
+        )
+    return file_size, b"".join(chunks) if chunks is not None else None
 
 @router.post("/upload", response_model=UploadResponse)
 async def upload_documents(
@@ -60,63 +93,76 @@ async def upload_documents(
     upload_dir = Path(settings.UPLOAD_DIR) / str(current_user.id) / str(collection.id)
     upload_dir.mkdir(parents=True, exist_ok=True)
     
-    document_ids = []
+    # Resolved once per request; frozenset for O(1) membership checks
+    supported_extensions = doc_processor.get_supported_extensions()
+    supported_extension_set = frozenset(supported_extensions)
     
+    # Validate every file type before writing anything
     for file in files:
-        # Validate file size
-        file.file.seek(0, 2)  # Seek to end
-        file_size = file.file.tell()
-        file.file.seek(0)  # Reset to beginning
-        
-        if file_size > settings.MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File {file.filename} exceeds maximum size of {settings.MAX_FILE_SIZE} bytes"
-            )
-        
-        # Get file extension
         file_extension = Path(file.filename).suffix.lower()
-        
-        # Validate file type
-        supported_extensions = doc_processor.get_supported_extensions()
-        if file_extension not in supported_extensions:
+        if file_extension not in supported_extension_set:
             raise HTTPException(
                 status_code=400,
                 detail=f"File type {file_extension} not supported. Supported types: {supported_extensions}"
             )
-        
-        # Save file
-        file_path = upload_dir / file.filename
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Create title from filename
-        title = Path(file.filename).stem
-        if len(title) > 100:
-            title = title[:97] + "..."
+    
+    docs = []
+    contents = []
+    try:
+        for file in files:
+            # Save file, enforcing the size limit while streaming; small files the
+            # processor can read from memory are also kept in memory
+            file_path = upload_dir / file.filename
+            file_size, content = await _save_upload(
+                file,
+                file_path,
+                keep_bytes=Path(file.filename).suffix.lower() in doc_processor.INLINE_EXTENSIONS
+            )
+            contents.append(content)
+            
+            # Create title from filename
+            title = Path(file.filename).stem
+            if len(title) > 100:
+                title = title[:97] + "..."
 
-        # Create document record
-        doc = Document(
-            filename=file.filename,
-            title=title,
-            file_path=str(file_path),
-            file_type=file_extension,
-            file_size=file_size,
-            collection_id=collection.id,
-            user_id=current_user.id,
-            status="pending"
-        )
-        db.add(doc)
-        await db.commit()
-        await db.refresh(doc)
-        document_ids.append(doc.id)
+            docs.append(Document(
+                filename=file.filename,
+                title=title,
+                file_path=str(file_path),
+                file_type=Path(file.filename).suffix.lower(),
+                file_size=file_size,
+                collection_id=collection.id,
+                user_id=current_user.id,
+                status="pending"
+            ))
         
-        # Schedule background processing
+        # One multi-row INSERT ... RETURNING and a single commit for the whole batch
+        async with deferred_constraints(db):
+            db.add_all(docs)
+            await db.flush()
+            await db.execute(
+                update(Collection)
+                .where(Collection.id == collection.id)
+                .values(document_count=Collection.document_count + len(docs))
+            )
+            await db.commit()
+    except Exception:
+        # The batch is all-or-nothing: don't leave files without Document rows
+        await asyncio.gather(
+            *(asyncio.to_thread(_try_unlink, doc.file_path) for doc in docs),
+            return_exceptions=True
+        )
+        raise
+    document_ids = [doc.id for doc in docs]
+    
+    # Schedule background processing only once the rows are committed
+    for doc, content in zip(docs, contents):
         background_tasks.add_task(
             doc_processor.process_document,
             doc.id,
-            str(file_path),
-            collection_name
+            doc.file_path,
+            collection_name,
+            content
         )
     
     return UploadResponse(
@@ -129,46 +175,53 @@ async def upload_documents(
 async def list_documents(
     collection_name: Optional[str] = None,
     status: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[int] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List documents, optionally filtered by collection and status"""
-    query = select(Document).where(Document.user_id == current_user.id)
+    """List documents, optionally filtered by collection and status.
+
+    Newest first, at most `limit` per page (default 100). Pass the last
+    returned id as `cursor` to fetch the next page.
+    """
+    # Collection name comes from the join instead of a lookup per document
+    query = (
+        select(Document, Collection.name)
+        .join(Collection, Collection.id == Document.collection_id)
+        .where(Document.user_id == current_user.id)
+    )
     
     if collection_name:
-        query = query.join(Collection).where(Collection.name == collection_name)
+        query = query.where(Collection.name == collection_name)
     
     if status:
         query = query.where(Document.status == status)
     
-    query = query.order_by(Document.created_at.desc())
+    # Keyset pagination on the primary key instead of OFFSET
+    if cursor is not None:
+        query = query.where(Document.id < cursor)
+    
+    query = query.order_by(Document.id.desc()).limit(limit)
     result = await db.execute(query)
-    documents = result.scalars().all()
     
-    # Load collections for each document
-    response = []
-    for doc in documents:
-        collection_result = await db.execute(
-            select(Collection).where(Collection.id == doc.collection_id)
-        )
-        collection = collection_result.scalar_one()
-        
-        response.append(DocumentResponse(
+    return [
+        DocumentResponse(
             id=doc.id,
             filename=doc.filename,
             title=doc.title,
             file_type=doc.file_type,
             file_size=doc.file_size,
             collection_id=doc.collection_id,
-            collection_name=collection.name,
+            collection_name=doc_collection_name,
             status=doc.status,
             chunk_count=doc.chunk_count,
             error_message=doc.error_message,
             created_at=doc.created_at,
             processed_at=doc.processed_at
-        ))
-    
-    return response
+        )
+        for doc, doc_collection_name in result
+    ]
 
 @router.get("/{document_id}", response_model=DocumentResponse)
 async def get_document(
@@ -178,20 +231,18 @@ async def get_document(
 ):
     """Get document details"""
     result = await db.execute(
-        select(Document).where(
+        select(Document, Collection.name)
+        .join(Collection, Collection.id == Document.collection_id)
+        .where(
             Document.id == document_id,
             Document.user_id == current_user.id
         )
     )
-    doc = result.scalar_one_or_none()
+    row = result.one_or_none()
     
-    if not doc:
+    if not row:
         raise HTTPException(status_code=404, detail="Document not found")
-    
-    collection_result = await db.execute(
-        select(Collection).where(Collection.id == doc.collection_id)
-    )
-    collection = collection_result.scalar_one()
+    doc, collection_name = row
     
     return DocumentResponse(
         id=doc.id,
@@ -200,7 +251,7 @@ async def get_document(
         file_type=doc.file_type,
         file_size=doc.file_size,
         collection_id=doc.collection_id,
-        collection_name=collection.name,
+        collection_name=collection_name,
         status=doc.status,
         chunk_count=doc.chunk_count,
         error_message=doc.error_message,
@@ -216,13 +267,16 @@ async def get_document_visualization(
     vector_store = Depends(get_vector_store_service)
 ):
     """Get 3D visualization data for document vectors"""
+    # Status and collection name in one round-trip; vectors come from Milvus
     result = await db.execute(
-        select(Document).where(
+        select(Document.status, Collection.name.label("collection_name"))
+        .join(Collection, Collection.id == Document.collection_id)
+        .where(
             Document.id == document_id,
             Document.user_id == current_user.id
         )
     )
-    doc = result.scalar_one_or_none()
+    doc = result.one_or_none()
 
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
@@ -231,14 +285,10 @@ async def get_document_visualization(
     if doc.status != "completed":
         raise HTTPException(status_code=400, detail="Document is not yet processed")
 
-    # Get collection name
-    collection_result = await db.execute(
-        select(Collection).where(Collection.id == doc.collection_id)
-    )
-    collection = collection_result.scalar_one()
-
     # Get 3D visualization data for this document only
-    viz_data = vector_store.get_3d_visualization_data(collection.name, document_id)
+    viz_data = await asyncio.to_thread(
+        vector_store.get_3d_visualization_data, doc.collection_name, document_id
+    )
 
     if "error" in viz_data:
         raise HTTPException(status_code=500, detail=viz_data["error"])
@@ -253,36 +303,46 @@ async def delete_document(
     vector_store = Depends(get_vector_store_service)
 ):
     """Delete a document"""
+    # Authorize, delete and fetch what cleanup needs in one statement; the
+    # transaction only commits once the file is gone
     result = await db.execute(
-        select(Document).where(
+        delete(Document)
+        .where(
             Document.id == document_id,
             Document.user_id == current_user.id
         )
+        .returning(
+            Document.file_path,
+            Document.collection_id,
+            select(Collection.name)
+            .where(Collection.id == Document.collection_id)
+            .scalar_subquery()
+            .label("collection_name")
+        )
     )
-    doc = result.scalar_one_or_none()
+    doc = result.one_or_none()
 
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # Get collection name
-    collection_result = await db.execute(
-        select(Collection).where(Collection.id == doc.collection_id)
+    await db.execute(
+        update(Collection)
+        .where(Collection.id == doc.collection_id)
+        .values(document_count=Collection.document_count - 1)
     )
-    collection = collection_result.scalar_one()
 
-    # Delete vectors from Milvus
-    try:
-        vector_store.delete_documents_by_id(collection.name, document_id)
-    except Exception as e:
+    # Delete vectors from Milvus and the file from disk concurrently
+    vectors_result, unlink_result = await asyncio.gather(
+        asyncio.to_thread(vector_store.delete_documents_by_id, doc.collection_name, document_id),
+        asyncio.to_thread(_try_unlink, doc.file_path),
+        return_exceptions=True
+    )
+    if isinstance(vectors_result, Exception):
         # Log error but don't fail the entire operation
-        logger.error(f"Failed to delete vectors for document {document_id}: {e}")
-
-    # Delete file from filesystem
-    if os.path.exists(doc.file_path):
-        os.remove(doc.file_path)
+        logger.error(f"Failed to delete vectors for document {document_id}: {vectors_result}")
+    if isinstance(unlink_result, Exception):
+        raise unlink_result
 
-    # Delete from database
-    await db.delete(doc)
     await db.commit()
 
     return {"message": "Document deleted successfully"}
@@ -296,29 +356,33 @@ async def batch_process(
     doc_processor: DocumentProcessor = Depends(get_document_processor)
 ):
     """Batch process multiple documents"""
-    # Verify all documents belong to user
+    # Repeated ids would make the count below disagree with the request
+    document_ids = list(dict.fromkeys(document_ids))
+    
+    # Verify ownership and resolve the collection in one aggregate query,
+    # without materializing the documents
     result = await db.execute(
-        select(Document).where(
+        select(Collection.name, sql_func.count(Document.id))
+        .join(Collection, Collection.id == Document.collection_id)
+        .where(
             Document.id.in_(document_ids),
             Document.user_id == current_user.id
         )
+        .group_by(Collection.id, Collection.name)
     )
-    documents = result.scalars().all()
+    per_collection = result.all()
     
-    if len(documents) != len(document_ids):
+    if not per_collection or sum(count for _, count in per_collection) != len(document_ids):
         raise HTTPException(status_code=404, detail="Some documents not found")
-    
-    # Get collection name from first document
-    collection_result = await db.execute(
-        select(Collection).where(Collection.id == documents[0].collection_id)
-    )
-    collection = collection_result.scalar_one()
+    if len(per_collection) > 1:
+        raise HTTPException(status_code=400, detail="Documents must belong to the same collection")
+    collection_name = per_collection[0][0]
     
     # Schedule batch processing
     background_tasks.add_task(
         doc_processor.batch_process_documents,
         document_ids,
-        collection.name
+        collection_name
     )
     
     return {
@@ -1,33 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from cachetools import TTLCache
 
 from app.infra.database import get_db
-from app.infra import User
+from app.infra import User, UserSettings
 from app.api.v1.deps import get_current_user
 from app.domain.schemas.user_settings import AISettings, AISettingsResponse
 
 router = APIRouter(tags=["settings"])
 
-# In-memory storage for now (you can add a database table later)
-user_settings = {}
+# Bounded per-worker read cache; entries expire so other workers' writes show up
+_settings_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+DEFAULT_AI_SETTINGS = AISettings().model_dump()
+
+async def _save_settings(db: AsyncSession, user_id: int, values: dict) -> dict:
+    """Upsert the user's settings in one statement and refresh the cache."""
+    stmt = insert(UserSettings).values(user_id=user_id, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserSettings.user_id],
+        set_={**values, "updated_at": func.now()},
+    )
+    await db.execute(stmt)
+    await db.commit()
+    _settings_cache[user_id] = values
+    return values
 
 @router.get("/ai-settings", response_model=AISettingsResponse)
 async def get_ai_settings(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get AI settings for the current user"""
     user_id = current_user.id
     
-    # Return user's settings or defaults
-    settings = user_settings.get(user_id, {
-        "llm_model": "ollama_cloud",
-        "embedding_model": "text-embedding-3-small",
-        "temperature": 7,
-        "max_tokens": 2000,
-        "top_k": 5
-    })
+    settings = _settings_cache.get(user_id)
+    if settings is None:
+        row = await db.get(UserSettings, user_id)
+        # Return user's settings or defaults
+        settings = (
+            {field: getattr(row, field) for field in DEFAULT_AI_SETTINGS}
+            if row else DEFAULT_AI_SETTINGS
+        )
+        _settings_cache[user_id] = settings
     
     return {
         **settings,
@@ -37,47 +54,27 @@ async def get_ai_settings(
 @router.put("/ai-settings", response_model=AISettingsResponse)
 async def update_ai_settings(
     settings: AISettings,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update AI settings for the current user"""
-    user_id = current_user.id
-    
-    # Validate settings
-    if settings.temperature < 0 or settings.temperature > 20:
-        raise HTTPException(status_code=400, detail="Temperature must be between 0 and 20")
-    
-    if settings.max_tokens < 100 or settings.max_tokens > 8000:
-        raise HTTPException(status_code=400, detail="Max tokens must be between 100 and 8000")
-    
-    if settings.top_k < 1 or settings.top_k > 20:
-        raise HTTPException(status_code=400, detail="Top-K must be between 1 and 20")
-    
-    # Store settings
-    user_settings[user_id] = settings.dict()
+    # Ranges are enforced by the AISettings schema before we get here
+    saved = await _save_settings(db, current_user.id, settings.model_dump())
     
     return {
-        **settings.dict(),
-        "user_id": user_id
+        **saved,
+        "user_id": current_user.id
     }
 
 @router.post("/ai-settings/reset", response_model=AISettingsResponse)
 async def reset_ai_settings(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Reset AI settings to defaults"""
-    user_id = current_user.id
-    
-    defaults = {
-        "llm_model": "ollama_cloud",
-        "embedding_model": "text-embedding-3-small",
-        "temperature": 7,
-        "max_tokens": 2000,
-        "top_k": 5
-    }
-    
-    user_settings[user_id] = defaults
+    saved = await _save_settings(db, current_user.id, dict(DEFAULT_AI_SETTINGS))
     
     return {
-        **defaults,
-        "user_id": user_id
+        **saved,
+        "user_id": current_user.id
     }
@@ -1,10 +1,14 @@
 from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
+from typing import List, Optional
 import httpx
 from app.core.config import settings
 import logging
 import asyncio
-import json
+import hashlib
+import re
+import orjson
+from cachetools import LRUCache, TTLCache
+from redis.exceptions import RedisError
 from app.infra.redis import redis_client
 from app.services.service_manager import get_llm_service
 
@@ -16,41 +20,127 @@ router = APIRouter()
 llm_service = get_llm_service()
 
 CACHE_EXPIRY = 600  # 10 minutes
-
-async def get_cached_weather(city: str, country_code: str = None):
-    """Get cached weather data"""
+FORECAST_CACHE_EXPIRY = 3600  # 1 hour; OpenWeather updates forecasts every ~3h
+
+# In-process L1 in front of Redis for the hottest keys. Kept short so a
+# Redis entry re-read near its expiry isn't served much past it.
+L1_CACHE_EXPIRY = 60
+_l1_cache: TTLCache = TTLCache(maxsize=1024, ttl=L1_CACHE_EXPIRY)
+
+# Shared client so OpenWeather connections (and their TLS sessions) are kept
+# alive across requests; closed from the app's shutdown hook
+http_client = httpx.AsyncClient(
+    timeout=10.0,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+)
+
+# LLM insights depend only on bucketed conditions, so they are shared across
+# cities and kept much longer than the weather itself
+INSIGHTS_CACHE_EXPIRY = 86400  # 24 hours
+
+# Used when Redis is unavailable
+_insights_fallback_cache: LRUCache = LRUCache(maxsize=256)
+
+# JSON object inside a ```json fenced block in an LLM reply
+_FENCED_JSON = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.S)
+
+async def close_http_client():
+    """Close the shared OpenWeather client"""
+    await http_client.aclose()
+
+async def _get_cached(key: str):
+    """Get cached JSON data for a key (in-process first, then Redis)"""
+    data = _l1_cache.get(key)
+    if data is not None:
+        return data
     try:
-        key = f"weather:{city}:{country_code or ''}"
         cached = await redis_client.get(key)
         if cached:
-            logger.info(f"Returning cached weather for {key}")
-            return json.loads(cached)
+            logger.info(f"Returning cached data for {key}")
+            data = orjson.loads(cached)
+            _l1_cache[key] = data
+            return data
         logger.info(f"No cache found for {key}")
         return None
     except Exception as e:
-        logger.error(f"Error getting cached weather: {e}")
+        logger.error(f"Error getting cached data for {key}: {e}")
         return None
 
-async def set_cached_weather(city: str, data: dict, country_code: str = None):
-    """Set cached weather data"""
+async def _set_cached(key: str, data: dict, expiry: int):
+    """Cache JSON data under a key"""
+    _l1_cache[key] = data
+    try:
+        await redis_client.setex(key, expiry, orjson.dumps(data))
+        logger.info(f"Cached data for {key}")
+    except Exception as e:
+        logger.error(f"Error setting cached data for {key}: {e}")
+
+async def _get_cached_many(keys: List[str]) -> List[Optional[dict]]:
+    """Get cached JSON data for several keys with one Redis MGET"""
+    results = [_l1_cache.get(key) for key in keys]
+    missing = [i for i, data in enumerate(results) if data is None]
+    if not missing:
+        return results
     try:
-        key = f"weather:{city}:{country_code or ''}"
-        await redis_client.setex(key, CACHE_EXPIRY, json.dumps(data))
-        logger.info(f"Cached weather for {key}")
+        values = await redis_client.mget([keys[i] for i in missing])
     except Exception as e:
-        logger.error(f"Error setting cached weather: {e}")
+        logger.error(f"Error getting cached data for {len(missing)} keys: {e}")
+        return results
+    for i, value in zip(missing, values):
+        if value:
+            results[i] = _l1_cache[keys[i]] = orjson.loads(value)
+    return results
+
+def _norm_key(prefix: str, city: str, country_code: str = None) -> str:
+    """Cache key that ignores case and stray whitespace in the user's input"""
+    city = " ".join(city.strip().casefold().split())
+    country_code = (country_code or "").strip().upper()
+    return f"{prefix}:{city}:{country_code}"
+
+async def get_cached_weather(city: str, country_code: str = None):
+    """Get cached weather data"""
+    return await _get_cached(_norm_key("weather", city, country_code))
+
+async def set_cached_weather(city: str, data: dict, country_code: str = None):
+    """Set cached weather data"""
+    await _set_cached(_norm_key("weather", city, country_code), data, CACHE_EXPIRY)
+
+async def get_cached_weather_many(cities: List[str], country_code: str = None) -> List[Optional[dict]]:
+    """Get cached weather data for several cities in one round-trip"""
+    return await _get_cached_many([_norm_key("weather", city, country_code) for city in cities])
+
+async def get_cached_forecast(city: str, country_code: str = None):
+    """Get cached forecast data"""
+    return await _get_cached(_norm_key("forecast", city, country_code))
+
+async def set_cached_forecast(city: str, data: dict, country_code: str = None):
+    """Set cached forecast data"""
+    await _set_cached(_norm_key("forecast", city, country_code), data, FORECAST_CACHE_EXPIRY)
 
 async def fetch_and_cache_weather(city: str, country_code: str = None):
     """Fetch weather data and cache it"""
     try:
-        # Fetch current weather
-        weather_data = await fetch_openweather_data(city, country_code, "weather")
+        # Fetch current weather and 5-day forecast concurrently
+        weather_task = asyncio.create_task(fetch_openweather_data(city, country_code, "weather"))
+        forecast_task = asyncio.create_task(fetch_openweather_data(city, country_code, "forecast"))
 
-        # Fetch 5-day forecast
-        forecast_data = await fetch_openweather_data(city, country_code, "forecast")
+        try:
+            weather_data = await weather_task
+        except Exception:
+            forecast_task.cancel()
+            raise
+
+        # Insights only need the current weather, so the LLM call overlaps
+        # the forecast fetch
+        insights_task = asyncio.create_task(generate_ai_insights(weather_data))
+
+        try:
+            forecast_data = await forecast_task
+        except Exception:
+            insights_task.cancel()
+            raise
 
-        # Generate AI insights
-        ai_insights = await generate_ai_insights(weather_data, forecast_data)
+        ai_insights = await insights_task
 
         # Process current weather
         current_weather = {
@@ -74,22 +164,10 @@ async def fetch_and_cache_weather(city: str, country_code: str = None):
         }
 
         # Process 5-day forecast (one entry per day)
-        forecast_list = []
-        seen_dates = set()
-
-        for item in forecast_data["list"]:
-            date = item["dt_txt"].split(" ")[0]
-            if date not in seen_dates and len(forecast_list) < 5:
-                seen_dates.add(date)
-                forecast_list.append(
-                    {
-                        "date": date,
-                        "temp_max": item["main"]["temp_max"],
-                        "temp_min": item["main"]["temp_min"],
-                        "description": item["weather"][0]["description"],
-                        "icon": item["weather"][0]["main"],
-                    }
-                )
+        forecast_list = [
+            _slot_to_entry(date, item)
+            for date, item in list(_first_slot_per_day(forecast_data["list"]).items())[:5]
+        ]
 
         data = {
             "weather": current_weather,
@@ -106,6 +184,43 @@ async def fetch_and_cache_weather(city: str, country_code: str = None):
 
 
 
+def _first_slot_per_day(slots: list) -> dict:
+    """First 3-hour forecast slot of each day, keyed by date, in order"""
+    by_date = {}
+    for item in slots:
+        # dt_txt is "YYYY-MM-DD HH:MM:SS"
+        by_date.setdefault(item["dt_txt"][:10], item)
+    return by_date
+
+
+def _slot_to_entry(date: str, item: dict) -> dict:
+    """Forecast entry shared by /current and /forecast"""
+    return {
+        "date": date,
+        "temp_max": item["main"]["temp_max"],
+        "temp_min": item["main"]["temp_min"],
+        "description": item["weather"][0]["description"],
+        "icon": item["weather"][0]["main"],
+    }
+
+
+# In-flight fetches by cache key, so concurrent misses for the same city share
+# one upstream fetch. No lock needed: lookup and insert happen without an
+# await in between.
+_inflight: dict[str, asyncio.Task] = {}
+
+async def _fetch_and_cache_weather_once(city: str, country_code: str = None):
+    """Fetch and cache weather, joining an in-flight fetch for the same key if any"""
+    key = _norm_key("weather", city, country_code)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(fetch_and_cache_weather(city, country_code))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shielded so one client disconnecting doesn't cancel the others' fetch
+    return await asyncio.shield(task)
+
+
 async def fetch_openweather_data(city: str, country_code: str = None, endpoint: str = "weather"):
     """Fetch data from OpenWeatherMap API"""
     api_key = settings.OPENWEATHER_API_KEY
@@ -121,64 +236,42 @@ async def fetch_openweather_data(city: str, country_code: str = None, endpoint:
     query = f"{city},{country_code}" if country_code else city
     params = {"q": query, "appid": api_key, "units": "metric"}
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, params=params, timeout=10.0)
-            
-            # Check if response is JSON
-            content_type = response.headers.get('content-type', '')
-            if 'application/json' not in content_type:
-                logger.error(f"Non-JSON response from weather API: {response.text[:200]}")
-                raise HTTPException(
-                    status_code=500, 
-                    detail="Weather API returned invalid response. Please check API key."
-                )
-            
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                raise HTTPException(status_code=404, detail=f"City '{city}' not found")
-            elif e.response.status_code == 401:
-                raise HTTPException(status_code=500, detail="Invalid weather API key")
-            raise HTTPException(
-                status_code=e.response.status_code,
-                detail=f"Weather API error: {e.response.text[:200]}",
-            )
-        except httpx.RequestError as e:
-            logger.error(f"Request error fetching weather: {e}")
-            raise HTTPException(
-                status_code=503, detail="Unable to reach weather service"
-            )
-        except Exception as e:
-            logger.error(f"Unexpected error in weather API: {e}")
+    try:
+        response = await http_client.get(url, params=params)
+        
+        # Check if response is JSON
+        content_type = response.headers.get('content-type', '')
+        if 'application/json' not in content_type:
+            logger.error(f"Non-JSON response from weather API: {response.text[:200]}")
             raise HTTPException(
-                status_code=500, detail=f"Weather service error: {str(e)}"
+                status_code=500, 
+                detail="Weather API returned invalid response. Please check API key."
             )
+        
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            raise HTTPException(status_code=404, detail=f"City '{city}' not found")
+        elif e.response.status_code == 401:
+            raise HTTPException(status_code=500, detail="Invalid weather API key")
+        raise HTTPException(
+            status_code=e.response.status_code,
+            detail=f"Weather API error: {e.response.text[:200]}",
+        )
+    except httpx.RequestError as e:
+        logger.error(f"Request error fetching weather: {e}")
+        raise HTTPException(
+            status_code=503, detail="Unable to reach weather service"
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error in weather API: {e}")
+        raise HTTPException(
+            status_code=500, detail=f"Weather service error: {str(e)}"
+        )
 
 
-async def generate_ai_insights(weather_data: dict, forecast_data: dict) -> dict:
-    """Generate AI insights based on weather data"""
-    try:
-        # Get LLM instance
-        llm, _ = llm_service.get_llm(temperature=0.7)
-
-        # Prepare weather summary for LLM
-        current = weather_data["main"]
-        weather_desc = weather_data["weather"][0]["description"]
-        temp = current["temp"]
-        feels_like = current["feels_like"]
-        humidity = current["humidity"]
-        wind_speed = weather_data["wind"]["speed"]
-
-        # Create prompt for AI insights
-        prompt = f"""Based on the following weather conditions, provide helpful insights:
-
-Current Weather:
-- Temperature: {temp}°C (feels like {feels_like}°C)
-- Conditions: {weather_desc}
-- Humidity: {humidity}%
-- Wind Speed: {wind_speed} km/h
+_INSIGHTS_PROMPT_PREFIX = """Based on the weather conditions given at the end, provide helpful insights.
 
 Please provide:
 1. A brief weather analysis (2-3 sentences)
@@ -187,39 +280,49 @@ Please provide:
 4. Three outfit/clothing suggestions
 
 Format your response as JSON with the following structure:
-{{
+{
   "analysis": "your analysis here",
   "activities": ["activity 1", "activity 2", "activity 3"],
   "health_tips": ["tip 1", "tip 2", "tip 3"],
   "outfit_suggestions": ["suggestion 1", "suggestion 2", "suggestion 3"]
-}}"""
+}
 
-        # Invoke LLM
-        response = await llm.ainvoke(prompt)
-        
-        # Parse response
-        import json
-        
-        # Try to extract JSON from response
-        response_text = response.content if hasattr(response, 'content') else str(response)
-        
-        # Find JSON in response
-        start_idx = response_text.find('{')
-        end_idx = response_text.rfind('}') + 1
-        
-        if start_idx != -1 and end_idx > start_idx:
-            json_str = response_text[start_idx:end_idx]
-            insights = json.loads(json_str)
-        else:
-            # Fallback if JSON parsing fails
-            insights = {
-                "analysis": f"The weather is {weather_desc} with a temperature of {temp}°C. {_get_generic_analysis(temp, weather_desc)}",
-                "activities": _get_generic_activities(temp, weather_desc),
-                "health_tips": _get_generic_health_tips(temp, weather_desc),
-                "outfit_suggestions": _get_generic_outfit_suggestions(temp, weather_desc),
-            }
+"""
+
+_INSIGHTS_PROMPT_TAIL = """Current Weather:
+- Temperature: {temp}°C (feels like {feels_like}°C)
+- Conditions: {weather_desc}
+- Humidity: {humidity}%
+- Wind Speed: {wind_speed} km/h"""
 
-        return insights
+# In-flight LLM insight calls by cache key, so concurrent requests for the
+# same conditions bucket (e.g. several cities in one batch) share one call
+_insights_inflight: dict[str, asyncio.Task] = {}
+
+async def generate_ai_insights(weather_data: dict) -> dict:
+    """Generate AI insights based on current weather data"""
+    try:
+        # Prepare weather summary for LLM
+        current = weather_data["main"]
+        weather_desc = weather_data["weather"][0]["description"]
+        temp = current["temp"]
+        feels_like = current["feels_like"]
+        humidity = current["humidity"]
+        wind_speed = weather_data["wind"]["speed"]
+
+        cache_key = _insights_key(temp, weather_desc, humidity, wind_speed)
+        cached = await _get_cached_insights(cache_key)
+        if cached:
+            return cached
+
+        task = _insights_inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(
+                _invoke_insights_llm(cache_key, temp, feels_like, weather_desc, humidity, wind_speed)
+            )
+            _insights_inflight[cache_key] = task
+            task.add_done_callback(lambda _: _insights_inflight.pop(cache_key, None))
+        return await asyncio.shield(task)
 
     except Exception as e:
         logger.error(f"Error generating AI insights: {e}")
@@ -232,80 +335,176 @@ Format your response as JSON with the following structure:
         }
 
 
+async def _invoke_insights_llm(
+    cache_key: str,
+    temp: float,
+    feels_like: float,
+    weather_desc: str,
+    humidity: float,
+    wind_speed: float
+) -> dict:
+    """Ask the LLM for insights and cache them if the reply parses"""
+    # Get LLM instance
+    llm, _ = llm_service.get_llm(temperature=0.7)
+
+    # Static instructions first so providers with automatic prefix caching
+    # can reuse them; only the short conditions tail varies per call
+    prompt = _INSIGHTS_PROMPT_PREFIX + _INSIGHTS_PROMPT_TAIL.format(
+        temp=temp,
+        feels_like=feels_like,
+        weather_desc=weather_desc,
+        humidity=humidity,
+        wind_speed=wind_speed,
+    )
+
+    # Invoke LLM
+    response = await llm.ainvoke(prompt)
+    
+    # Try to extract JSON from response
+    response_text = response.content if hasattr(response, 'content') else str(response)
+    
+    # Prefer a fenced ```json block; otherwise take the outermost braces
+    fenced = _FENCED_JSON.search(response_text)
+    start_idx = response_text.find('{')
+    end_idx = response_text.rfind('}') + 1
+    
+    if fenced or (start_idx != -1 and end_idx > start_idx):
+        json_str = fenced.group(1) if fenced else response_text[start_idx:end_idx]
+        insights = orjson.loads(json_str)
+        await _set_cached_insights(cache_key, insights)
+    else:
+        # Fallback if JSON parsing fails
+        insights = {
+            "analysis": f"The weather is {weather_desc} with a temperature of {temp}°C. {_get_generic_analysis(temp, weather_desc)}",
+            "activities": _get_generic_activities(temp, weather_desc),
+            "health_tips": _get_generic_health_tips(temp, weather_desc),
+            "outfit_suggestions": _get_generic_outfit_suggestions(temp, weather_desc),
+        }
+
+    return insights
+
+
+def _prompt_key(prompt: str) -> str:
+    """Fixed-size (16-byte) cache key for an LLM prompt"""
+    return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _insights_key(temp: float, weather_desc: str, humidity: float, wind_speed: float) -> str:
+    """Cache key for insights, quantized so similar conditions share an entry.
+
+    Hashes the normalized conditions rather than the rendered prompt, which
+    embeds raw readings (27.4°C vs 27°C would never collide).
+    """
+    conditions = f"{round(temp)}|{weather_desc.strip().casefold()}|{int(humidity) // 10}|{round(wind_speed)}"
+    return f"wxinsights:{_prompt_key(conditions)}"
+
+
+async def _get_cached_insights(key: str) -> Optional[dict]:
+    """Get cached insights, falling back to the in-process cache if Redis is down"""
+    try:
+        cached = await redis_client.get(key)
+    except RedisError as e:
+        logger.warning(f"Redis unavailable for insights cache: {e}")
+        return _insights_fallback_cache.get(key)
+    return orjson.loads(cached) if cached else None
+
+
+async def _set_cached_insights(key: str, insights: dict):
+    """Cache insights in Redis and in-process"""
+    _insights_fallback_cache[key] = insights
+    try:
+        await redis_client.setex(key, INSIGHTS_CACHE_EXPIRY, orjson.dumps(insights))
+    except RedisError as e:
+        logger.warning(f"Redis unavailable for insights cache: {e}")
+
+
+# Temperature bands for the generic (non-LLM) insights
+_COLD, _MILD, _WARM = 0, 1, 2
+
+_ANALYSIS = (
+    "It's quite cold outside. Bundle up and stay warm!",
+    "Pleasant moderate temperatures. Great for outdoor activities!",
+    "Warm weather conditions. Stay hydrated and protect yourself from the sun!",
+)
+
+_ACTIVITIES = (
+    (
+        "Visit indoor museums or galleries",
+        "Enjoy hot beverages at a cozy café",
+        "Indoor sports or gym activities",
+    ),
+    (
+        "Go for a nature walk or hike",
+        "Outdoor photography session",
+        "Visit local parks or gardens",
+    ),
+    (
+        "Swimming or water sports",
+        "Outdoor picnic in the shade",
+        "Early morning or evening jogging",
+    ),
+)
+
+_HEALTH_TIPS = (
+    (
+        "Dress in layers to maintain body warmth",
+        "Protect extremities with gloves and warm socks",
+        "Stay active to keep circulation going",
+    ),
+    (
+        "Stay hydrated throughout the day",
+        "Light layers for temperature changes",
+        "Good time for outdoor exercise",
+    ),
+    (
+        "Drink plenty of water to stay hydrated",
+        "Use sunscreen with SPF 30 or higher",
+        "Avoid prolonged sun exposure during peak hours",
+    ),
+)
+
+_OUTFIT_SUGGESTIONS = (
+    (
+        "Heavy winter coat or jacket",
+        "Warm sweater and thermal layers",
+        "Boots and warm accessories (scarf, hat, gloves)",
+    ),
+    (
+        "Light jacket or cardigan",
+        "Long sleeves with comfortable pants",
+        "Comfortable walking shoes",
+    ),
+    (
+        "Light, breathable fabrics",
+        "Shorts or light pants with t-shirt",
+        "Sunglasses and sun hat recommended",
+    ),
+)
+
+
+def _band(temp: float) -> int:
+    """Temperature band used to index the generic tables"""
+    return _COLD if temp < 10 else _MILD if temp < 20 else _WARM
+
+
 def _get_generic_analysis(temp: float, desc: str) -> str:
     """Generate generic weather analysis"""
-    if temp < 10:
-        return "It's quite cold outside. Bundle up and stay warm!"
-    elif temp < 20:
-        return "Pleasant moderate temperatures. Great for outdoor activities!"
-    else:
-        return "Warm weather conditions. Stay hydrated and protect yourself from the sun!"
+    return _ANALYSIS[_band(temp)]
 
 
-def _get_generic_activities(temp: float, desc: str) -> list:
+def _get_generic_activities(temp: float, desc: str) -> tuple:
     """Generate generic activity suggestions"""
-    if temp < 10:
-        return [
-            "Visit indoor museums or galleries",
-            "Enjoy hot beverages at a cozy café",
-            "Indoor sports or gym activities",
-        ]
-    elif temp < 20:
-        return [
-            "Go for a nature walk or hike",
-            "Outdoor photography session",
-            "Visit local parks or gardens",
-        ]
-    else:
-        return [
-            "Swimming or water sports",
-            "Outdoor picnic in the shade",
-            "Early morning or evening jogging",
-        ]
+    return _ACTIVITIES[_band(temp)]
 
 
-def _get_generic_health_tips(temp: float, desc: str) -> list:
+def _get_generic_health_tips(temp: float, desc: str) -> tuple:
     """Generate generic health tips"""
-    if temp < 10:
-        return [
-            "Dress in layers to maintain body warmth",
-            "Protect extremities with gloves and warm socks",
-            "Stay active to keep circulation going",
-        ]
-    elif temp < 20:
-        return [
-            "Stay hydrated throughout the day",
-            "Light layers for temperature changes",
-            "Good time for outdoor exercise",
-        ]
-    else:
-        return [
-            "Drink plenty of water to stay hydrated",
-            "Use sunscreen with SPF 30 or higher",
-            "Avoid prolonged sun exposure during peak hours",
-        ]
+    return _HEALTH_TIPS[_band(temp)]
 
 
-def _get_generic_outfit_suggestions(temp: float, desc: str) -> list:
+def _get_generic_outfit_suggestions(temp: float, desc: str) -> tuple:
     """Generate generic outfit suggestions"""
-    if temp < 10:
-        return [
-            "Heavy winter coat or jacket",
-            "Warm sweater and thermal layers",
-            "Boots and warm accessories (scarf, hat, gloves)",
-        ]
-    elif temp < 20:
-        return [
-            "Light jacket or cardigan",
-            "Long sleeves with comfortable pants",
-            "Comfortable walking shoes",
-        ]
-    else:
-        return [
-            "Light, breathable fabrics",
-            "Shorts or light pants with t-shirt",
-            "Sunglasses and sun hat recommended",
-        ]
+    return _OUTFIT_SUGGESTIONS[_band(temp)]
 
 
 @router.get("/current")
@@ -320,8 +519,8 @@ async def get_current_weather(
         if cached_data:
             return cached_data
 
-        # No cache, fetch and cache
-        data = await fetch_and_cache_weather(city, country_code)
+        # No cache, fetch and cache (shared with concurrent misses for the same key)
+        data = await _fetch_and_cache_weather_once(city, country_code)
         if data:
             return data
         else:
@@ -334,6 +533,52 @@ async def get_current_weather(
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/current/batch")
+async def get_current_weather_batch(
+    cities: List[str] = Query(..., description="City names"),
+    country_code: str = Query(None, description="ISO 3166 country code applied to every city")
+):
+    """Get current weather with AI insights for several cities at once.
+
+    Cities are fetched concurrently; insight generation is shared between
+    cities whose conditions fall in the same bucket.
+    """
+    # One fetch per normalized city, in request order
+    unique = {}
+    for city in cities:
+        unique.setdefault(_norm_key("weather", city, country_code), city)
+
+    # Probe the cache for every city at once; only misses are fetched
+    cities = list(unique.values())
+    cached = await get_cached_weather_many(cities, country_code)
+
+    async def get_or_fetch(city: str, cached_data: Optional[dict]):
+        if cached_data:
+            return cached_data
+        data = await _fetch_and_cache_weather_once(city, country_code)
+        if not data:
+            raise HTTPException(status_code=503, detail="Unable to fetch weather data")
+        return data
+
+    results = await asyncio.gather(
+        *(get_or_fetch(city, data) for city, data in zip(cities, cached)),
+        return_exceptions=True
+    )
+
+    weather = {}
+    errors = {}
+    for city, result in zip(cities, results):
+        if isinstance(result, HTTPException):
+            errors[city] = result.detail
+        elif isinstance(result, Exception):
+            logger.error(f"Error in get_current_weather_batch for {city}: {result}")
+            errors[city] = "Internal server error"
+        else:
+            weather[city] = result
+
+    return {"results": weather, "errors": errors}
+
+
 @router.get("/forecast")
 async def get_forecast(
     city: str = Query(..., description="City name"),
@@ -341,29 +586,25 @@ async def get_forecast(
 ):
     """Get 5-day weather forecast for a city"""
     try:
+        cached_data = await get_cached_forecast(city, country_code)
+        if cached_data:
+            return cached_data
+
         forecast_data = await fetch_openweather_data(city, country_code, "forecast")
 
         # Process forecast data
-        forecast_list = []
-        seen_dates = set()
-
-        for item in forecast_data["list"]:
-            date = item["dt_txt"].split(" ")[0]
-            if date not in seen_dates:
-                seen_dates.add(date)
-                forecast_list.append(
-                    {
-                        "date": date,
-                        "temp_max": item["main"]["temp_max"],
-                        "temp_min": item["main"]["temp_min"],
-                        "description": item["weather"][0]["description"],
-                        "icon": item["weather"][0]["main"],
-                        "humidity": item["main"]["humidity"],
-                        "wind_speed": item["wind"]["speed"] * 3.6,
-                    }
-                )
-
-        return {"city": forecast_data["city"]["name"], "forecast": forecast_list}
+        forecast_list = [
+            {
+                **_slot_to_entry(date, item),
+                "humidity": item["main"]["humidity"],
+                "wind_speed": item["wind"]["speed"] * 3.6,
+            }
+            for date, item in _first_slot_per_day(forecast_data["list"]).items()
+        ]
+
+        data = {"city": forecast_data["city"]["name"], "forecast": forecast_list}
+        await set_cached_forecast(city, data, country_code)
+        return data
 
     except HTTPException:
         raise
@@ -6,6 +6,9 @@ class LLMConstants:
     MIN_TEMPERATURE = 0.0
     DEFAULT_TEMPERATURE = 0.7
     TEMPERATURE_SCALE = 10.0  # For converting UI scale (0-20) to API scale (0-2)
+    MAX_UI_TEMPERATURE = 20
+    # UI scale -> API scale, indexed per message instead of dividing (i / TEMPERATURE_SCALE)
+    TEMPERATURE_LUT = tuple(map(TEMPERATURE_SCALE.__rtruediv__, range(MAX_UI_TEMPERATURE + 1)))
     CHAT_HISTORY_LIMIT = 10
     MAX_TITLE_LENGTH = 50
 
@@ -1,11 +1,15 @@
 """
 Hardware detection utilities for GPU/CPU availability
+
+Results are cached: the hardware doesn't change while the process runs.
 """
 import logging
+from functools import lru_cache
 from typing import Dict, Any
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=1)
 def detect_device() -> str:
     """Detect available compute device (GPU preferred, CPU fallback)"""
     try:
@@ -23,7 +27,16 @@ def detect_device() -> str:
         return 'cpu'
 
 def get_hardware_info() -> Dict[str, Any]:
-    """Get comprehensive hardware information"""
+    """Get comprehensive hardware information.
+
+    Each call returns its own copy of the cached probe, so a caller that
+    modifies the result can't change what other callers see.
+    """
+    info = _probe_hardware_info()
+    return {**info, "gpu_names": list(info["gpu_names"])}
+
+@lru_cache(maxsize=1)
+def _probe_hardware_info() -> Dict[str, Any]:
     info = {
         "cpu_available": True,
         "gpu_available": False,
@@ -54,6 +67,7 @@ def get_hardware_info() -> Dict[str, Any]:
 
     return info
 
+@lru_cache(maxsize=1)
 def is_gpu_available() -> bool:
     """Quick check if GPU is available"""
     try:
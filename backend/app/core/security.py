@@ -1,11 +1,39 @@
+import asyncio
+import logging
+import time
+from functools import lru_cache
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 from jose import jwt
+from jose.exceptions import ExpiredSignatureError
 from argon2 import PasswordHasher
 from app.core.config import settings
 
-# Initialize Argon2 hasher (secure defaults)
-ph = PasswordHasher()
+logger = logging.getLogger(__name__)
+
+# Argon2id at the OWASP minimum (19 MiB, t=2, p=1) rather than the library
+# defaults (64 MiB, t=3, p=4): roughly tens of ms per hash on server CPUs, so
+# login latency stays predictable under bursts. Existing hashes keep verifying
+# since their parameters are stored in the hash itself.
+ph = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+
+# Acceptable time for one hash; checked once at startup
+HASH_TIME_TARGET_MS = (10, 250)
+
+def check_password_hash_cost() -> float:
+    """Time one Argon2 hash and warn if it falls outside HASH_TIME_TARGET_MS."""
+    start = time.perf_counter()
+    ph.hash("self-test")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    low, high = HASH_TIME_TARGET_MS
+    if not low <= elapsed_ms <= high:
+        logger.warning(
+            f"Argon2 hash took {elapsed_ms:.0f} ms, outside the {low}-{high} ms target; "
+            "consider retuning the PasswordHasher parameters for this CPU"
+        )
+    else:
+        logger.info(f"Argon2 hash self-test: {elapsed_ms:.0f} ms")
+    return elapsed_ms
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
@@ -18,6 +46,14 @@ def hash_password(password: str) -> str:
     """Hash a plain password using Argon2."""
     return ph.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in a worker thread so Argon2 doesn't block the event loop."""
+    return await asyncio.to_thread(verify_password, plain_password, hashed_password)
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in a worker thread so Argon2 doesn't block the event loop."""
+    return await asyncio.to_thread(hash_password, password)
+
 def create_access_token(data: dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -33,6 +69,18 @@ def create_refresh_token(data: dict[str, Any]) -> str:
     to_encode = {**data, "exp": expire, "type": "refresh"}
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
+# Decoded tokens are reused for up to one window; expiry is re-checked on
+# every call, so a token can't outlive its exp inside a window.
+DECODE_CACHE_WINDOW = 30  # seconds
+
+@lru_cache(maxsize=4096)
+def _decode_cached(token: str, window: int) -> dict[str, Any]:
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
 def decode_token(token: str) -> dict[str, Any]:
     """Decode and validate a JWT token."""
-    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
\ No newline at end of file
+    now = int(time.time())
+    payload = _decode_cached(token, now // DECODE_CACHE_WINDOW)
+    if "exp" in payload and payload["exp"] < now:
+        raise ExpiredSignatureError("Signature has expired.")
+    return dict(payload)
\ No newline at end of file
@@ -2,7 +2,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """Domain model for Message entity"""
     id: Optional[int] = None
@@ -31,7 +31,7 @@ class Message:
         """Check if message has translation"""
         return self.translated_content is not None and self.translated_content.strip() != ""
 
-@dataclass
+@dataclass(slots=True)
 class ChatSession:
     """Domain model for ChatSession entity"""
     id: Optional[int] = None
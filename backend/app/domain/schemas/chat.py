@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional, Dict
 from datetime import datetime
 
@@ -7,6 +7,8 @@ class ChatMessageRequest(BaseModel):
     message: str
 
 class ChatMessageResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     message_id: int
     content: str
     sources: List[dict]
@@ -30,9 +32,10 @@ class CreateSessionRequest(BaseModel):
     ai_personality: Optional[str] = None
     response_style: Optional[str] = None
     voice: Optional[str] = None
-    voice: Optional[str] = None
 
 class SessionResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: int
     title: str
     collection_id: int
@@ -50,8 +53,11 @@ class SessionResponse(BaseModel):
     prompt_template: Optional[str] = None
     ai_personality: Optional[str] = None
     response_style: Optional[str] = None
+    voice: Optional[str] = None
 
 class MessageResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: Optional[int] = None # Optional for ephemeral
     role: str
     content: str
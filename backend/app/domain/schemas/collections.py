@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
 
@@ -7,6 +7,8 @@ class CollectionCreate(BaseModel):
     description: Optional[str] = None
 
 class CollectionResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: int
     name: str
     description: Optional[str]
@@ -15,6 +17,8 @@ class CollectionResponse(BaseModel):
     updated_at: datetime
 
 class CollectionStatsResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: int
     name: str
     document_count: int
@@ -1,8 +1,10 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 from datetime import datetime
 
 class DocumentResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: int
     filename: str
     title: Optional[str]
@@ -17,6 +19,8 @@ class DocumentResponse(BaseModel):
     processed_at: Optional[datetime]
 
 class UploadResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     message: str
     document_ids: List[int]
     collection_name: str
\ No newline at end of file
@@ -1,11 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class AISettings(BaseModel):
     llm_model: str = "ollama_cloud"
     embedding_model: str = "text-embedding-3-small"
-    temperature: int = 7  # 0-20 scale
-    max_tokens: int = 2000
-    top_k: int = 5
+    temperature: int = Field(default=7, ge=0, le=20)  # 0-20 scale
+    max_tokens: int = Field(default=2000, ge=100, le=8000)
+    top_k: int = Field(default=5, ge=1, le=20)
 
 class AISettingsResponse(BaseModel):
     llm_model: str
@@ -3,5 +3,6 @@ from .user import User
 from .collection import Collection
 from .document import Document
 from .chat import ChatSession, Message
+from .user_settings import UserSettings
 
-__all__ = ["Base", "User", "Collection", "Document", "ChatSession", "Message"]
+__all__ = ["Base", "User", "Collection", "Document", "ChatSession", "Message", "UserSettings"]
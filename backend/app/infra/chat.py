@@ -1,4 +1,5 @@
-from sqlalchemy import String, Integer, DateTime, ForeignKey, Text, JSON, func
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Text, JSON, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from typing import List, Optional, TYPE_CHECKING
@@ -10,11 +11,17 @@ if TYPE_CHECKING:
 
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
+    __table_args__ = (
+        # Serves list_sessions: WHERE user_id = ? ORDER BY updated_at DESC
+        Index("ix_chat_sessions_user_updated", "user_id", text("updated_at DESC")),
+    )
+    # Fetch server-generated timestamps with RETURNING on INSERT instead of a refresh
+    __mapper_args__ = {"eager_defaults": True}
     
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     title: Mapped[str] = mapped_column(String(500), default="New Chat", nullable=False)
-    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
-    collection_id: Mapped[int] = mapped_column(Integer, ForeignKey("collections.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", deferrable=True, initially="IMMEDIATE"), nullable=False)
+    collection_id: Mapped[int] = mapped_column(Integer, ForeignKey("collections.id", deferrable=True, initially="IMMEDIATE"), nullable=False)
     llm_model: Mapped[str] = mapped_column(String(100), default="ollama", nullable=False)
     temperature: Mapped[int] = mapped_column(Integer, default=7, nullable=False)  # 0-20 (0.0-2.0)
     max_tokens: Mapped[int] = mapped_column(Integer, default=2000, nullable=False)
@@ -31,22 +38,34 @@ class ChatSession(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
     
-    # Relationships
+    # Relationships (the collection is read alongside the session on the
+    # chat paths, so it's loaded with one IN query rather than lazily)
     user: Mapped["User"] = relationship("User", back_populates="chat_sessions")
-    collection: Mapped["Collection"] = relationship("Collection", back_populates="chat_sessions")
+    collection: Mapped["Collection"] = relationship("Collection", back_populates="chat_sessions", lazy="selectin")
     messages: Mapped[List["Message"]] = relationship("Message", back_populates="session", cascade="all, delete-orphan")
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Serves get_messages: WHERE session_id = ? ORDER BY created_at
+        Index("ix_messages_session_created", "session_id", "created_at"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    session_id: Mapped[int] = mapped_column(Integer, ForeignKey("chat_sessions.id"), nullable=False)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    session_id: Mapped[int] = mapped_column(Integer, ForeignKey("chat_sessions.id", deferrable=True, initially="IMMEDIATE"), nullable=False)
     role: Mapped[str] = mapped_column(String(50), nullable=False)  # user, assistant, system
     content: Mapped[str] = mapped_column(Text, nullable=False)
-    sources: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    # Wide, rarely-read columns are left out of entity loads; the chat paths
+    # select the columns they need explicitly.
+    # JSONB on PostgreSQL (GIN-indexed, and @> available in queries); plain JSON elsewhere.
+    # None is stored as SQL NULL rather than a JSON 'null' value.
+    sources: Mapped[Optional[dict]] = mapped_column(
+        JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql"), nullable=True, deferred=True
+    )
     llm_used: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
-    audio_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
-    translated_content: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    audio_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True, deferred=True)
+    translated_content: Mapped[Optional[str]] = mapped_column(Text, nullable=True, deferred=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
 
     # Relationships
@@ -1,4 +1,5 @@
-from sqlalchemy import String, Integer, DateTime, ForeignKey, Text, func
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Text, UniqueConstraint, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from typing import List, Optional, TYPE_CHECKING
@@ -11,16 +12,40 @@ if TYPE_CHECKING:
 
 class Collection(Base):
     __tablename__ = "collections"
+    __table_args__ = (
+        UniqueConstraint("user_id", "name", name="uq_collection_user_name"),
+    )
     
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(255), index=True, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", deferrable=True, initially="IMMEDIATE"), nullable=False)
     embedding_model: Mapped[str] = mapped_column(String(255), default="sentence-transformers/all-MiniLM-L6-v2", nullable=False)
+    # Maintained by the document insert/delete paths so listings don't COUNT(*)
+    document_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
     
-    # Relationships
+    # Relationships (documents can be large; load them explicitly with
+    # selectinload where needed rather than by implicit attribute access)
     user: Mapped["User"] = relationship("User", back_populates="collections")
-    documents: Mapped[List["Document"]] = relationship("Document", back_populates="collection", cascade="all, delete-orphan")
+    documents: Mapped[List["Document"]] = relationship("Document", back_populates="collection", cascade="all, delete-orphan", lazy="raise")
     chat_sessions: Mapped[List["ChatSession"]] = relationship("ChatSession", back_populates="collection")
+
+
+async def recount_document_counts(db: AsyncSession, collection_id: Optional[int] = None) -> None:
+    """Rebuild document_count from the documents table.
+
+    Fallback for when the maintained counter has drifted; recounts one
+    collection, or every collection when collection_id is None. The caller commits.
+    """
+    from .document import Document
+
+    stmt = update(Collection).values(
+        document_count=select(func.count(Document.id))
+        .where(Document.collection_id == Collection.id)
+        .scalar_subquery()
+    )
+    if collection_id is not None:
+        stmt = stmt.where(Collection.id == collection_id)
+    await db.execute(stmt)
@@ -0,0 +1,14 @@
+"""
+Per-process limits on concurrent work that holds pooled resources
+"""
+import asyncio
+from app.core.config import settings
+
+# Connections kept free for short requests (auth, listings) that don't take the semaphore
+DB_RESERVED_CONNECTIONS = 5
+
+# Caps DB-holding work (chat turns, audio/translation writes) below the
+# pool's capacity, so excess requests queue here instead of timing out in the pool
+DB_SEMAPHORE = asyncio.Semaphore(
+    max(1, settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW - DB_RESERVED_CONNECTIONS)
+)
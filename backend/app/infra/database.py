@@ -1,18 +1,75 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from contextlib import asynccontextmanager
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncSession
 from app.core.config import settings
 
+
+def _connect_args() -> dict:
+    """asyncpg-specific statement caching and timeouts; other drivers take no extra args."""
+    if "+asyncpg" not in str(settings.DATABASE_URL):
+        return {}
+
+    server_settings = {}
+    if settings.DB_STATEMENT_TIMEOUT:
+        server_settings["statement_timeout"] = settings.DB_STATEMENT_TIMEOUT
+    if settings.DB_LOCK_TIMEOUT:
+        server_settings["lock_timeout"] = settings.DB_LOCK_TIMEOUT
+
+    if settings.DB_PGBOUNCER:
+        # Without client-side prepares, let the server reuse generic plans
+        server_settings["plan_cache_mode"] = "force_generic_plan"
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "server_settings": server_settings,
+        }
+    return {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE // 2,
+        "server_settings": server_settings,
+    }
+
+
 engine = create_async_engine(
     str(settings.DATABASE_URL),
     echo=False,
     pool_pre_ping=True,
-    pool_size=20,
-    max_overflow=30,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    # Reuse the most recently returned connection so idle ones can age out
+    pool_use_lifo=True,
+    connect_args=_connect_args(),
 )
 
-AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+# Writes are flushed explicitly (flush/commit), so queries don't pay for autoflush
+AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+def pool_status() -> dict:
+    """Snapshot of the connection pool for health reporting."""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "status": pool.status(),
+    }
 
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
-        # No need to close — handled by async with
\ No newline at end of file
+        # No need to close — handled by async with
+
+@asynccontextmanager
+async def deferred_constraints(db: AsyncSession):
+    """Defer FK checks to commit time for bulk writes in the current transaction.
+
+    All foreign keys are DEFERRABLE INITIALLY IMMEDIATE, so this only affects the
+    transaction it is issued in. No-op on backends without SET CONSTRAINTS.
+    """
+    if db.bind.dialect.name == "postgresql":
+        await db.execute(text("SET CONSTRAINTS ALL DEFERRED"))
+    yield db
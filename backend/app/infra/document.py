@@ -1,4 +1,5 @@
 from sqlalchemy import String, Integer, DateTime, ForeignKey, Text, JSON, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from typing import Optional, TYPE_CHECKING
@@ -11,18 +12,19 @@ if TYPE_CHECKING:
 class Document(Base):
     __tablename__ = "documents"
     
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     filename: Mapped[str] = mapped_column(String(500), nullable=False)
     title: Mapped[Optional[str]] = mapped_column(String(500), nullable=True, index=True)
     file_path: Mapped[str] = mapped_column(String(1000), nullable=False)
     file_type: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     file_size: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
-    collection_id: Mapped[int] = mapped_column(Integer, ForeignKey("collections.id"), nullable=False)
-    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+    collection_id: Mapped[int] = mapped_column(Integer, ForeignKey("collections.id", deferrable=True, initially="IMMEDIATE"), nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", deferrable=True, initially="IMMEDIATE"), nullable=False)
     status: Mapped[str] = mapped_column(String(50), default="pending", nullable=False)
     chunk_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    doc_metadata: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    # JSONB on PostgreSQL (GIN-indexed, and @> available in queries); plain JSON elsewhere
+    doc_metadata: Mapped[Optional[dict]] = mapped_column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
     processed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
@@ -0,0 +1,47 @@
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from alembic import command
+from alembic.config import Config
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# Reported by /health/migrations
+migration_status: Dict[str, Any] = {
+    "mode": settings.MIGRATION_MODE,
+    "state": "skipped" if settings.MIGRATION_MODE == "skip" else "pending",
+    "started_at": None,
+    "finished_at": None,
+    "error": None,
+}
+
+
+def _upgrade_head() -> None:
+    """Run `alembic upgrade head` against the configured database."""
+    os.environ.setdefault("MIGRATION_LOCK_TIMEOUT", settings.MIGRATION_LOCK_TIMEOUT)
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("sqlalchemy.url", str(settings.DATABASE_URL))
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+
+async def run_migrations_async() -> None:
+    """Upgrade the schema in a worker thread so the event loop keeps serving."""
+    migration_status.update(state="running", started_at=time.time(), error=None)
+    logger.info("Running database migrations")
+    try:
+        await asyncio.to_thread(_upgrade_head)
+    except Exception as e:
+        migration_status.update(state="failed", finished_at=time.time(), error=str(e))
+        logger.error(f"Database migrations failed: {e}")
+        raise
+    migration_status.update(state="completed", finished_at=time.time())
+    logger.info("Database migrations completed")
@@ -1,16 +1,114 @@
+import functools
+import hashlib
+import json
+import logging
+
 import redis.asyncio as redis
+from redis.exceptions import NoScriptError, RedisError
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 redis_client = redis.from_url(str(settings.REDIS_URL), decode_responses=True)
 
+# Auth keys and values are small and ASCII, so the auth paths use a bytes-only
+# client and key templates instead of encoding/decoding str on every call
+auth_redis = redis.from_url(str(settings.REDIS_URL))
+
+REFRESH_TOKEN_KEY = b"refresh_token:%d:%s"
+USER_CACHE_KEY = b"auth:user:%d"
+
+def _refresh_key(user_id: int, token_jti: str) -> bytes:
+    return REFRESH_TOKEN_KEY % (user_id, token_jti.encode())
+
 async def store_refresh_token(user_id: int, token_jti: str, expires_in_days: int = 7) -> None:
-    key = f"refresh_token:{user_id}:{token_jti}"
-    await redis_client.setex(key, expires_in_days * 24 * 3600, "valid")
+    await auth_redis.setex(_refresh_key(user_id, token_jti), expires_in_days * 24 * 3600, b"valid")
 
 async def invalidate_refresh_token(user_id: int, token_jti: str) -> None:
-    key = f"refresh_token:{user_id}:{token_jti}"
-    await redis_client.delete(key)
+    await auth_redis.delete(_refresh_key(user_id, token_jti))
+
+# Atomically consume the old refresh token and register its replacement, so a
+# refresh is one round-trip and two concurrent refreshes cannot both succeed.
+ROTATE_REFRESH_TOKEN_LUA = """
+if redis.call('DEL', KEYS[1]) == 1 then
+    redis.call('SETEX', KEYS[2], ARGV[1], 'valid')
+    return 1
+end
+return 0
+"""
+ROTATE_REFRESH_TOKEN_SHA = hashlib.sha1(ROTATE_REFRESH_TOKEN_LUA.encode()).hexdigest()
+
+async def rotate_refresh_token_and_get_user(
+    user_id: int, old_jti: str, new_jti: str, expires_in_days: int = 7
+) -> tuple[bool, dict | None]:
+    """Rotate a refresh token and read the cached user identity in one round-trip.
+
+    Returns whether the old token was valid (and is now consumed) and the
+    cached identity, or None on a cache miss.
+    """
+    keys = [_refresh_key(user_id, old_jti), _refresh_key(user_id, new_jti)]
+    ttl = expires_in_days * 24 * 3600
+    pipe = auth_redis.pipeline(transaction=False)
+    pipe.evalsha(ROTATE_REFRESH_TOKEN_SHA, 2, *keys, ttl)
+    pipe.get(USER_CACHE_KEY % user_id)
+    rotated, cached = await pipe.execute(raise_on_error=False)
+    if isinstance(rotated, NoScriptError):
+        # First call on this Redis instance; EVAL also loads it into the script cache
+        rotated = await auth_redis.eval(ROTATE_REFRESH_TOKEN_LUA, 2, *keys, ttl)
+    elif isinstance(rotated, Exception):
+        raise rotated
+    if isinstance(cached, Exception):
+        logger.warning(f"Redis user cache read failed for {user_id}: {cached}")
+        cached = None
+    return rotated == 1, json.loads(cached) if cached else None
+
+async def invalidate_many(user_id: int, token_jtis: list[str]) -> None:
+    """Revoke several refresh tokens (e.g. logging out every session) in one round-trip."""
+    if not token_jtis:
+        return
+    pipe = auth_redis.pipeline(transaction=False)
+    for token_jti in token_jtis:
+        pipe.unlink(_refresh_key(user_id, token_jti))
+    await pipe.execute()
 
 async def is_refresh_token_valid(user_id: int, token_jti: str) -> bool:
-    key = f"refresh_token:{user_id}:{token_jti}"
-    return await redis_client.exists(key) == 1
\ No newline at end of file
+    return await auth_redis.exists(_refresh_key(user_id, token_jti)) == 1
+
+async def get_cached_user(user_id: int) -> dict | None:
+    """Cached identity of an authenticated user, or None on miss/Redis failure."""
+    try:
+        cached = await auth_redis.get(USER_CACHE_KEY % user_id)
+    except RedisError as e:
+        logger.warning(f"Redis user cache read failed for {user_id}: {e}")
+        return None
+    return json.loads(cached) if cached else None
+
+async def cache_user(user_id: int, data: dict, ttl: int) -> None:
+    try:
+        await auth_redis.setex(USER_CACHE_KEY % user_id, ttl, json.dumps(data).encode())
+    except RedisError as e:
+        logger.warning(f"Redis user cache write failed for {user_id}: {e}")
+
+def redis_cache(key: str, ttl: int):
+    """Cache a coroutine's JSON-serializable result in Redis under a fixed key.
+
+    Redis being unavailable is not fatal: the wrapped coroutine is called directly.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                cached = await redis_client.get(key)
+                if cached is not None:
+                    return json.loads(cached)
+            except RedisError as e:
+                logger.warning(f"Redis cache read failed for {key}: {e}")
+
+            value = await func(*args, **kwargs)
+            try:
+                await redis_client.set(key, json.dumps(value), ex=ttl)
+            except RedisError as e:
+                logger.warning(f"Redis cache write failed for {key}: {e}")
+            return value
+        return wrapper
+    return decorator
@@ -0,0 +1,15 @@
+from sqlalchemy import String, Integer, DateTime, ForeignKey, func
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from .base import Base
+
+class UserSettings(Base):
+    __tablename__ = "user_settings"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", deferrable=True, initially="IMMEDIATE"), primary_key=True)
+    llm_model: Mapped[str] = mapped_column(String(100), default="ollama_cloud", nullable=False)
+    embedding_model: Mapped[str] = mapped_column(String(255), default="text-embedding-3-small", nullable=False)
+    temperature: Mapped[int] = mapped_column(Integer, default=7, nullable=False)  # 0-20 (0.0-2.0)
+    max_tokens: Mapped[int] = mapped_column(Integer, default=2000, nullable=False)
+    top_k: Mapped[int] = mapped_column(Integer, default=5, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -1,15 +1,91 @@
 import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.core.logger import setup_logging
 from app.api.v1 import auth, weather, user_settings, chats, documents, collections
 from app.infra import Base
-from app.infra.database import engine
+from app.infra.database import engine, pool_status
+from app.infra.migrations import migration_status, run_migrations_async
+from app.infra import redis as redis_infra
 
 # Setup logging
 setup_logging(settings.LOG_LEVEL)
 
+async def _run_background_migrations():
+    try:
+        await run_migrations_async()
+    except Exception:
+        # Already recorded in migration_status; keep serving
+        pass
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize database and services on startup, release connections on shutdown"""
+    # Database initialization is handled by init_db.py script
+    # No need to call it here
+
+    # Create upload directory
+    import os
+    from app.core.config import settings
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    print(f"✅ Upload directory created: {settings.UPLOAD_DIR}")
+
+    # Password hashing cost sanity check (off the event loop)
+    from app.core.security import check_password_hash_cost
+    await asyncio.to_thread(check_password_hash_cost)
+
+    # Apply pending migrations according to MIGRATION_MODE
+    if settings.MIGRATION_MODE == "sync":
+        await run_migrations_async()
+    elif settings.MIGRATION_MODE == "async":
+        app.state.migration_task = asyncio.create_task(_run_background_migrations())
+
+    # Pre-initialize services to avoid lazy loading overhead
+    print("🚀 Pre-initializing services...")
+    try:
+        from app.services.service_manager import (
+            get_embedding_service,
+            get_vector_store_service,
+            get_llm_service,
+            get_rag_service,
+            get_speech_service,
+            get_chat_service
+        )
+
+        # Getters are sync and may block (model load, Milvus handshake), so each
+        # runs in a thread; services within a level don't depend on each other.
+        # Vector store needs embedding, so it can't share the first level.
+        levels = [
+            [("Embedding", get_embedding_service), ("LLM", get_llm_service), ("Speech", get_speech_service)],
+            [("Vector store", get_vector_store_service)],
+            [("RAG", get_rag_service)],
+            [("Chat", get_chat_service)],
+        ]
+        for level in levels:
+            await asyncio.gather(*(asyncio.to_thread(getter) for _, getter in level))
+            for name, _ in level:
+                print(f"✅ {name} service initialized")
+
+        print("🎉 All services pre-initialized successfully!")
+
+    except Exception as e:
+        print(f"⚠️  Service pre-initialization failed: {e}")
+        print("Services will be initialized lazily as needed")
+
+    yield
+
+    # Close shared clients so sockets aren't left dangling on SIGTERM
+    await asyncio.gather(
+        weather.close_http_client(),
+        redis_infra.redis_client.aclose(),
+        redis_infra.auth_redis.aclose(),
+        engine.dispose(),
+        return_exceptions=True
+    )
+
 app = FastAPI(
     title="Niki RAG API",
     version="0.2.0",
@@ -17,6 +93,8 @@ app = FastAPI(
     docs_url="/api/docs",
     openapi_url="/api/openapi.json",
     swagger_ui_parameters={"persistAuthorization": True},
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # CORS – tighten in production!
@@ -40,6 +118,16 @@ app.include_router(user_settings.router, prefix="/api/v1/settings", tags=["setti
 async def health_check():
     return {"status": "ok", "version": "0.2.0"}
 
+@app.get("/health/pool")
+async def pool_health():
+    """Report database connection pool usage"""
+    return pool_status()
+
+@app.get("/health/migrations")
+async def migrations_health():
+    """Report the state of startup migrations"""
+    return migration_status
+
 @app.get("/api/v1/llm/status")
 async def llm_status():
     """Check LLM availability"""
@@ -88,56 +176,6 @@ async def speech_status():
         }
     }
 
-# Initialize database tables on startup
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database and services on startup"""
-    # Database initialization is handled by init_db.py script
-    # No need to call it here
-
-    # Create upload directory
-    import os
-    from app.core.config import settings
-    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-    print(f"✅ Upload directory created: {settings.UPLOAD_DIR}")
-
-    # Pre-initialize services to avoid lazy loading overhead
-    print("🚀 Pre-initializing services...")
-    try:
-        from app.services.service_manager import (
-            get_embedding_service,
-            get_vector_store_service,
-            get_llm_service,
-            get_rag_service,
-            get_speech_service,
-            get_chat_service
-        )
-
-        # Initialize in dependency order
-        embedding_svc = get_embedding_service()
-        print("✅ Embedding service initialized")
-
-        vector_svc = get_vector_store_service()
-        print("✅ Vector store service initialized")
-
-        llm_svc = get_llm_service()
-        print("✅ LLM service initialized")
-
-        rag_svc = get_rag_service()
-        print("✅ RAG service initialized")
-
-        speech_svc = get_speech_service()
-        print("✅ Speech service initialized")
-
-        chat_svc = get_chat_service()
-        print("✅ Chat service initialized")
-
-        print("🎉 All services pre-initialized successfully!")
-
-    except Exception as e:
-        print(f"⚠️  Service pre-initialization failed: {e}")
-        print("Services will be initialized lazily as needed")
-
 # Mount static files
 from fastapi.staticfiles import StaticFiles
 app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
\ No newline at end of file
@@ -1,18 +1,34 @@
 import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import raiseload
 from app.infra import User
 from app.domain.schemas.user import UserCreate
-from app.core.security import verify_password, hash_password, create_access_token, create_refresh_token
-from app.infra.redis import store_refresh_token
+from app.core.security import verify_password_async, hash_password_async, create_access_token, create_refresh_token
+from fastapi import HTTPException
+from app.infra.redis import store_refresh_token, rotate_refresh_token_and_get_user
 from app.core.config import settings
+from cachetools import TTLCache
+
+# Per-worker email -> detached User for login bursts; password verification
+# still runs every time, only the row fetch is reused
+_user_by_email_cache: TTLCache = TTLCache(maxsize=1024, ttl=5)
 
 async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
-    result = await db.execute(select(User).where(User.email == email))
-    return result.scalar_one_or_none()
+    cached = _user_by_email_cache.get(email)
+    if cached is not None:
+        # Attach a copy to this session without a SELECT, so later lookups
+        # by primary key (create_tokens) hit the identity map
+        return await db.merge(cached, load=False)
+
+    result = await db.execute(select(User).options(raiseload("*")).where(User.email == email))
+    user = result.scalar_one_or_none()
+    if user is not None:
+        _user_by_email_cache[email] = user
+    return user
 
 async def create_user(db: AsyncSession, user_in: UserCreate) -> User:
-    hashed_pw = hash_password(user_in.password)
+    hashed_pw = await hash_password_async(user_in.password)
     user = User(email=user_in.email, hashed_password=hashed_pw)
     db.add(user)
     await db.commit()
@@ -21,31 +37,46 @@ async def create_user(db: AsyncSession, user_in: UserCreate) -> User:
 
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> User | None:
     user = await get_user_by_email(db, email)
-    if user and verify_password(password, user.hashed_password):
+    if user and await verify_password_async(password, user.hashed_password):
         return user
     return None
 
-async def create_tokens(user_id: int, db: AsyncSession) -> dict[str, any]:
+async def create_tokens(user_id: int, db: AsyncSession, rotate_jti: str | None = None) -> dict[str, any]:
     jti = str(uuid.uuid4())
     access_token = create_access_token(data={"sub": str(user_id)})
     refresh_token = create_refresh_token(data={"sub": str(user_id), "jti": jti})
     
-    # Store refresh token JTI in Redis for validation/revocation
-    await store_refresh_token(
-        user_id=user_id,
-        token_jti=jti,
-        expires_in_days=settings.REFRESH_TOKEN_EXPIRE_DAYS
-    )
+    # Store refresh token JTI in Redis for validation/revocation. On refresh the
+    # presented token is consumed in the same step, so it can only be used once;
+    # the cached user identity is read in the same round-trip.
+    cached_user = None
+    if rotate_jti:
+        rotated, cached_user = await rotate_refresh_token_and_get_user(
+            user_id=user_id,
+            old_jti=rotate_jti,
+            new_jti=jti,
+            expires_in_days=settings.REFRESH_TOKEN_EXPIRE_DAYS
+        )
+        if not rotated:
+            raise HTTPException(status_code=401, detail="Refresh token revoked or expired")
+    else:
+        await store_refresh_token(
+            user_id=user_id,
+            token_jti=jti,
+            expires_in_days=settings.REFRESH_TOKEN_EXPIRE_DAYS
+        )
     
-    # Get user info
-    user = await db.get(User, user_id)
+    # Get user info (on login/register the user is already in the session's
+    # identity map, so this doesn't hit the database)
+    if cached_user:
+        user_info = {"id": cached_user["id"], "email": cached_user["email"]}
+    else:
+        user = await db.get(User, user_id)
+        user_info = {"id": user.id, "email": user.email}
     
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
         "token_type": "bearer",
-        "user": {
-            "id": user.id,
-            "email": user.email
-        }
-    }
\ No newline at end of file
+        "user": user_info
+    }
@@ -1,11 +1,13 @@
-from datetime import datetime
-from typing import List, Optional, Dict
+import re
+from typing import List, Optional, Dict, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Row, delete, exists, func, insert, or_, select, update
+from sqlalchemy.orm import joinedload, raiseload
 from fastapi import HTTPException
 
 from app.infra import ChatSession, Message, User, Collection
+from app.infra.concurrency import DB_SEMAPHORE
+from app.infra.redis import redis_cache
 from app.services.rag_service import RAGService
 from app.services.speech_service import SpeechService
 from app.core.constants import LLMConstants
@@ -14,55 +16,49 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# One scan over the message instead of a substring pass per keyword list
+TITLE_RE = re.compile(
+    r"\b(?:(?P<greet>hello|hi|hey|greetings)"
+    r"|(?P<help>help|assist|support)"
+    r"|(?P<math>calculate|math|integral|derivative|solve)"
+    r"|(?P<weather>weather|temperature|forecast)"
+    r"|(?P<code>code|programming|python|javascript))\b",
+    re.IGNORECASE
+)
+
+TITLE_LABELS = {
+    "greet": "Greeting Chat",
+    "help": "Help Request",
+    "math": "Math Problem",
+    "weather": "Weather Discussion",
+    "code": "Programming Help",
+}
+
 class ChatService:
     def __init__(self, rag_service: RAGService, speech_service: SpeechService, llm_service):
         self.rag_service = rag_service
         self.speech_service = speech_service
         self.llm_service = llm_service
 
-    async def _generate_title(self, message_content: str, llm_model: str) -> str:
+    def _generate_title(self, message_content: str, llm_model: str) -> str:
         """Generate a short title based on the first message without LLM call"""
-        try:
-            # Simple title generation based on content
-            content = message_content.lower().strip()
-
-            # Common patterns
-            if any(word in content for word in ['hello', 'hi', 'hey', 'greetings']):
-                return "Greeting Chat"
-            elif any(word in content for word in ['help', 'assist', 'support']):
-                return "Help Request"
-            elif any(word in content for word in ['calculate', 'math', 'integral', 'derivative', 'solve']):
-                return "Math Problem"
-            elif any(word in content for word in ['weather', 'temperature', 'forecast']):
-                return "Weather Discussion"
-            elif any(word in content for word in ['code', 'programming', 'python', 'javascript']):
-                return "Programming Help"
-            elif len(content) > 10:
-                # Use first few words as title
-                words = content.split()[:3]
-                title = " ".join(words).title()
-                if len(title) > 20:
-                    title = title[:30] + "..."
-                return title
-            else:
-                return "New Chat"
-
-        except Exception as e:
-            logger.error(f"Error generating title: {e}")
+        # Simple title generation based on content
+        content = message_content.lower().strip()
+
+        # Common patterns
+        match = TITLE_RE.search(content)
+        if match:
+            return TITLE_LABELS[match.lastgroup]
+        elif len(content) > 10:
+            # Use first few words as title
+            words = content.split()[:3]
+            title = " ".join(words).title()
+            if len(title) > 20:
+                title = title[:30] + "..."
+            return title
+        else:
             return "New Chat"
 
-    async def get_session(self, session_id: int, user_id: int, db: AsyncSession) -> ChatSession:
-        result = await db.execute(
-            select(ChatSession).where(
-                ChatSession.id == session_id,
-                ChatSession.user_id == user_id
-            )
-        )
-        session = result.scalar_one_or_none()
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-        return session
-
     async def create_session(
         self,
         user_id: int,
@@ -97,7 +93,7 @@ class ChatService:
 
         session = ChatSession(
             user_id=user_id,
-            collection_id=collection_id,
+            collection=collection,
             llm_model=llm_model,
             temperature=temperature,
             max_tokens=max_tokens,
@@ -111,38 +107,129 @@ class ChatService:
             voice=voice
         )
         db.add(session)
+        # created_at/updated_at come back from the INSERT (eager_defaults)
         await db.commit()
-        await db.refresh(session)
         return session
 
-    async def list_sessions(self, user_id: int, db: AsyncSession) -> List[ChatSession]:
+    async def list_sessions(self, user_id: int, db: AsyncSession) -> List[Row]:
+        """List the user's sessions as rows shaped like SessionResponse"""
         result = await db.execute(
-            select(ChatSession)
+            select(
+                ChatSession.id,
+                ChatSession.title,
+                ChatSession.collection_id,
+                func.coalesce(Collection.name, "Unknown").label("collection_name"),
+                ChatSession.llm_model,
+                ChatSession.temperature,
+                ChatSession.max_tokens,
+                ChatSession.top_k,
+                ChatSession.created_at,
+                ChatSession.updated_at,
+                ChatSession.system_prompt,
+                ChatSession.custom_instructions,
+                ChatSession.prompt_template,
+                ChatSession.ai_personality,
+                ChatSession.response_style,
+                ChatSession.voice,
+            )
+            .outerjoin(Collection, Collection.id == ChatSession.collection_id)
             .where(ChatSession.user_id == user_id)
-            .options(selectinload(ChatSession.collection))
             .order_by(ChatSession.updated_at.desc())
         )
-        return result.scalars().all()
+        return result.all()
 
     async def delete_session(self, session_id: int, user_id: int, db: AsyncSession):
-        session = await self.get_session(session_id, user_id, db)
-        await db.delete(session)
+        owned = (
+            select(ChatSession.id)
+            .where(ChatSession.id == session_id, ChatSession.user_id == user_id)
+            .scalar_subquery()
+        )
+        # Messages first (no ON DELETE CASCADE in the schema), scoped to the owner
+        await db.execute(
+            delete(Message)
+            .where(Message.session_id == owned)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(
+            delete(ChatSession)
+            .where(ChatSession.id == session_id, ChatSession.user_id == user_id)
+            .returning(ChatSession.id)
+            .execution_options(synchronize_session=False)
+        )
+        if result.scalar_one_or_none() is None:
+            await db.rollback()
+            raise HTTPException(status_code=404, detail="Session not found")
         await db.commit()
 
     async def update_session_title(self, session_id: int, title: str, user_id: int, db: AsyncSession):
-        session = await self.get_session(session_id, user_id, db)
-        session.title = title
-        session.updated_at = datetime.utcnow()
+        result = await db.execute(
+            update(ChatSession)
+            .where(ChatSession.id == session_id, ChatSession.user_id == user_id)
+            # updated_at is set by the column's onupdate=func.now()
+            .values(title=title)
+            .returning(ChatSession.id)
+            .execution_options(synchronize_session=False)
+        )
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Session not found")
         await db.commit()
 
-    async def get_messages(self, session_id: int, user_id: int, db: AsyncSession) -> List[Message]:
-        await self.get_session(session_id, user_id, db) # Verify access
+    async def get_messages(self, session_id: int, user_id: int, db: AsyncSession) -> List[Row]:
+        """Messages of a session as rows shaped like MessageResponse"""
+        # Verify access without loading the session and its collection
+        owned = await db.execute(
+            select(ChatSession.id).where(
+                ChatSession.id == session_id,
+                ChatSession.user_id == user_id
+            )
+        )
+        if owned.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Session not found")
         result = await db.execute(
-            select(Message)
+            select(
+                Message.id,
+                Message.role,
+                Message.content,
+                Message.sources,
+                Message.llm_used,
+                Message.created_at,
+                Message.audio_url,
+                Message.translated_content,
+            )
             .where(Message.session_id == session_id)
             .order_by(Message.created_at)
         )
-        return result.scalars().all()
+        return result.all()
+
+    async def _load_session_bundle(
+        self,
+        session_id: int,
+        user_id: int,
+        db: AsyncSession
+    ) -> Tuple[ChatSession, Optional[Collection], List[Row]]:
+        """Everything send_message needs in two queries: the session joined with
+        its collection, then the last CHAT_HISTORY_LIMIT messages (oldest first)"""
+        result = await db.execute(
+            select(ChatSession)
+            .options(joinedload(ChatSession.collection), raiseload("*"))
+            .where(
+                ChatSession.id == session_id,
+                ChatSession.user_id == user_id
+            )
+        )
+        session = result.scalar_one_or_none()
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+
+        result = await db.execute(
+            select(Message.role, Message.content)
+            .where(Message.session_id == session_id)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(LLMConstants.CHAT_HISTORY_LIMIT)
+        )
+        recent_messages = result.all()
+        recent_messages.reverse()
+        return session, session.collection, recent_messages
 
     async def send_message(
         self,
@@ -154,31 +241,37 @@ class ChatService:
         """
         Send message, get RAG response, generate TTS/Translation.
         Returns Dict with answer, sources, audio_url, translated_content, message_id, etc.
-        """
-        session = await self.get_session(session_id, user_id, db)
-
-        # Get history
-        history = await self.get_messages(session_id, user_id, db)
-
-        # Auto-rename session if it's the first message and title is default or auto-generated
-        if len(history) == 0 and (session.title == "New Chat" or session.title.startswith("Auto:")):
-              try:
-                  new_title = await self._generate_title(message_content, session.llm_model)
-                  session.title = new_title
-                  await db.commit()
-              except Exception as e:
-                  logger.error(f"Failed to auto-rename session: {e}")
 
-        chat_history = [{"role": m.role, "content": m.content} for m in history[-LLMConstants.CHAT_HISTORY_LIMIT:]]
-
-        # Get collection for name
-        result = await db.execute(select(Collection).where(Collection.id == session.collection_id))
-        collection = result.scalar_one_or_none()
-        if not collection:
-              raise HTTPException(status_code=404, detail="Collection not found")
+        The database is only touched in two short transactions around the RAG
+        call, so no connection or DB_SEMAPHORE slot is held while the LLM runs.
+        """
+        async with DB_SEMAPHORE:
+            session, collection, history = await self._load_session_bundle(session_id, user_id, db)
+
+            if not collection:
+                raise HTTPException(status_code=404, detail="Collection not found")
+
+            # Auto-rename session if it's the first message and title is default or
+            # auto-generated. The guard is re-checked in the UPDATE itself, so two
+            # concurrent first messages can't both rename.
+            if not history and (session.title == "New Chat" or session.title.startswith("Auto:")):
+                await db.execute(
+                    update(ChatSession)
+                    .where(
+                        ChatSession.id == session_id,
+                        or_(ChatSession.title == "New Chat", ChatSession.title.startswith("Auto:")),
+                        ~exists().where(Message.session_id == session_id)
+                    )
+                    .values(title=self._generate_title(message_content, session.llm_model))
+                    .execution_options(synchronize_session=False)
+                )
+            # Releases the connection for the duration of the RAG call
+            await db.commit()
+
+        chat_history = [{"role": m.role, "content": m.content} for m in history]
 
         # RAG Generation
-        temp_float = session.temperature / LLMConstants.TEMPERATURE_SCALE
+        temp_float = LLMConstants.TEMPERATURE_LUT[min(LLMConstants.MAX_UI_TEMPERATURE, max(0, session.temperature))]
         rag_response = await self.rag_service.chat(
             collection_name=collection.name,
             message=message_content,
@@ -190,77 +283,98 @@ class ChatService:
             custom_instructions=session.custom_instructions
         )
 
-        # Persist User Message
-        user_msg = Message(session_id=session_id, role="user", content=message_content)
-        db.add(user_msg)
-
-        # Persist Assistant Message (audio and translation generated on-demand)
-        assistant_msg = Message(
-            session_id=session_id,
-            role="assistant",
-            content=rag_response["answer"],
-            sources=rag_response["sources"],
-            llm_used=rag_response.get("llm_used", session.llm_model),
-            audio_url=None,  # Generate on-demand when sound icon clicked
-            translated_content=None  # Generate on-demand when translation requested
-        )
-        db.add(assistant_msg)
+        # Persist both messages in one INSERT (audio and translation generated on-demand)
+        llm_used = rag_response.get("llm_used", session.llm_model)
+        async with DB_SEMAPHORE:
+            result = await db.execute(
+                insert(Message).returning(Message.id, Message.created_at, sort_by_parameter_order=True),
+                [
+                    {
+                        "session_id": session_id,
+                        "role": "user",
+                        "content": message_content,
+                        "sources": None,
+                        "llm_used": None,
+                    },
+                    {
+                        "session_id": session_id,
+                        "role": "assistant",
+                        "content": rag_response["answer"],
+                        "sources": rag_response["sources"],
+                        "llm_used": llm_used,
+                    },
+                ]
+            )
+            assistant_msg = result.all()[-1]
 
-        session.updated_at = datetime.utcnow()
-        await db.commit()
-        await db.refresh(assistant_msg)
+            # Evaluated by the database, matching the column's server-side defaults
+            session.updated_at = func.now()
+            await db.commit()
 
         return {
             "message_id": assistant_msg.id,
             "content": rag_response["answer"],
             "sources": rag_response["sources"],
-            "llm_used": rag_response.get("llm_used", session.llm_model),
+            "llm_used": llm_used,
             "created_at": assistant_msg.created_at,
             "audio_url": None,  # On-demand
             "translated_content": None  # On-demand
         }
 
-    async def generate_message_audio(self, message_id: int, db: AsyncSession) -> Dict:
-        logger.info(f"Generating audio for message {message_id}")
-        result = await db.execute(
-            select(Message)
-            .where(Message.id == message_id)
-            .options(selectinload(Message.session))
-        )
-        message = result.scalar_one_or_none()
-        if not message:
-            logger.error(f"Message {message_id} not found")
-            raise HTTPException(status_code=404, detail="Message not found")
-
-        # Get voice from the session the message belongs to
-        voice = message.session.voice or "auto"
-        logger.info(f"Using voice: {voice} for message {message_id}")
-        audio_url = await self.speech_service.generate_audio(message.content, voice=voice)
+    async def generate_message_audio(
+        self,
+        message_id: int,
+        content: str,
+        voice: Optional[str],
+        db: AsyncSession
+    ) -> Dict:
+        """Generate audio for a message the caller has already authorized and loaded.
+
+        No connection is held during synthesis; the semaphore only covers the write.
+        """
+        voice = voice or "auto"
+        logger.info(f"Generating audio for message {message_id} using voice: {voice}")
+        audio_url = await self.speech_service.generate_audio(content, voice=voice)
         logger.info(f"Audio generated: {audio_url} for message {message_id}")
 
-        # Update message with audio URL
-        message.audio_url = audio_url
-        await db.commit()
+        async with DB_SEMAPHORE:
+            await db.execute(
+                update(Message)
+                .where(Message.id == message_id)
+                .values(audio_url=audio_url)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
 
         return {"audio_url": audio_url}
 
-    async def translate_message(self, message_id: int, target_lang: str, db: AsyncSession) -> Dict:
-        logger.info(f"Translating message {message_id} to {target_lang}")
-        result = await db.execute(select(Message).where(Message.id == message_id))
-        message = result.scalar_one_or_none()
-        if not message:
-            logger.error(f"Message {message_id} not found")
-            raise HTTPException(status_code=404, detail="Message not found")
+    async def translate_message(
+        self,
+        message_id: int,
+        content: str,
+        target_lang: str,
+        db: AsyncSession
+    ) -> Dict:
+        """Translate a message the caller has already authorized and loaded.
 
-        translated = await self.speech_service.translate_text(message.content, target_lang)
+        No connection is held during translation; the semaphore only covers the write.
+        """
+        logger.info(f"Translating message {message_id} to {target_lang}")
+        translated = await self.speech_service.translate_text(content, target_lang)
         logger.info(f"Translation completed for message {message_id}")
 
-        # Update message with translated content
-        message.translated_content = translated
-        await db.commit()
+        async with DB_SEMAPHORE:
+            await db.execute(
+                update(Message)
+                .where(Message.id == message_id)
+                .values(translated_content=translated)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
 
         return {"translated_content": translated}
 
+    @redis_cache(key="chat:languages", ttl=3600)
     async def get_available_languages(self) -> list:
         """Get available translation languages"""
         return await self.speech_service.get_available_languages()
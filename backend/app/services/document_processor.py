@@ -5,14 +5,63 @@ from langchain_community.document_loaders import (
     UnstructuredFileLoader
 )
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
+import asyncio
 import logging
+import mmap
+import os
+from bisect import bisect_left, bisect_right
 from datetime import datetime
 import re
 
 logger = logging.getLogger(__name__)
 
+# LaTeX patterns to preserve, in priority order; the group name is the placeholder type
+LATEX_PATTERNS = [
+    (r'\$\$[\s\S]*?\$\$', 'DISPLAY_MATH'),  # $$...$$
+    (r'\\\[[\s\S]*?\\\]', 'DISPLAY_MATH_ALT'),  # \[...\]
+    (r'\\begin\{equation\}[\s\S]*?\\end\{equation\}', 'EQUATION_ENV'),  # \begin{equation}...\end{equation}
+    (r'\\begin\{align\}[\s\S]*?\\end\{align\}', 'ALIGN_ENV'),  # \begin{align}...\end{align}
+    (r'\\begin\{gather\}[\s\S]*?\\end\{gather\}', 'GATHER_ENV'),  # \begin{gather}...\end{gather}
+    (r'\$[^$\n]+\$', 'INLINE_MATH'),  # $...$
+    (r'\\\([\s\S]*?\\\)', 'INLINE_MATH_ALT'),  # \(...\)
+]
+
+# All patterns as one alternation, so a document is tokenized in a single pass
+LATEX_RE = re.compile(
+    '|'.join(f'(?P<{placeholder_type}>{pattern})' for pattern, placeholder_type in LATEX_PATTERNS),
+    re.MULTILINE
+)
+
+# Candidate split points, and the markers the "inside a placeholder" check looks for
+# (lookaheads, so overlapping "__" occurrences are all found)
+SENTENCE_END_RE = re.compile(r'[.!?\n]')
+PLACEHOLDER_START_RE = re.compile(r'(?=__LATEX_)')
+DOUBLE_UNDERSCORE_RE = re.compile(r'(?=__)')
+PLACEHOLDER_RE = re.compile(r'__LATEX_[A-Z_]+_\d+__')
+
+def decode_text(data) -> str:
+    """Decode UTF-8 file bytes the way TextLoader reads the file.
+
+    TextLoader opens in text mode, so CRLF and lone CR become LF; without
+    this the same upload would chunk and embed differently per load path.
+    """
+    return str(data, "utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+def load_text_mmap(file_path: str) -> List:
+    """Load a UTF-8 text file by decoding straight from a memory map.
+
+    Same result as TextLoader (newlines included), without first copying
+    the file into a bytes object.
+    """
+    from langchain_core.documents import Document
+
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            text = decode_text(view)
+    return [Document(page_content=text, metadata={"source": file_path})]
+
 class LaTeXAwareTextSplitter:
     """Text splitter that preserves LaTeX math expressions"""
 
@@ -21,70 +70,93 @@ class LaTeXAwareTextSplitter:
         self.chunk_overlap = chunk_overlap
 
         # LaTeX patterns to preserve
-        self.latex_patterns = [
-            (r'\$\$[\s\S]*?\$\$', 'DISPLAY_MATH'),  # $$...$$
-            (r'\\\[[\s\S]*?\\\]', 'DISPLAY_MATH_ALT'),  # \[...\]
-            (r'\\begin\{equation\}[\s\S]*?\\end\{equation\}', 'EQUATION_ENV'),  # \begin{equation}...\end{equation}
-            (r'\\begin\{align\}[\s\S]*?\\end\{align\}', 'ALIGN_ENV'),  # \begin{align}...\end{align}
-            (r'\\begin\{gather\}[\s\S]*?\\end\{gather\}', 'GATHER_ENV'),  # \begin{gather}...\end{gather}
-            (r'\$[^$\n]+\$', 'INLINE_MATH'),  # $...$
-            (r'\\\([\s\S]*?\\\)', 'INLINE_MATH_ALT'),  # \(...\)
-        ]
+        self.latex_pattern = LATEX_RE
 
     def split_text(self, text: str) -> List[str]:
         """Split text while preserving LaTeX expressions"""
         # Replace LaTeX expressions with placeholders
         placeholders = {}
-        placeholder_counter = 0
-        modified_text = text
 
-        for pattern, placeholder_type in self.latex_patterns:
-            def replace_func(match):
-                nonlocal placeholder_counter
-                placeholder = f"__LATEX_{placeholder_type}_{placeholder_counter}__"
-                placeholders[placeholder] = match.group(0)
-                placeholder_counter += 1
-                return placeholder
+        def replace_func(match):
+            placeholder = f"__LATEX_{match.lastgroup}_{len(placeholders)}__"
+            placeholders[placeholder] = match.group(0)
+            return placeholder
 
-            modified_text = re.sub(pattern, replace_func, modified_text, flags=re.MULTILINE)
+        modified_text = self.latex_pattern.sub(replace_func, text)
+
+        def restore(chunk: str) -> str:
+            # Restore LaTeX expressions in one scan of the chunk
+            return PLACEHOLDER_RE.sub(lambda m: placeholders.get(m.group(0), m.group(0)), chunk)
 
         # Split the modified text
-        chunks = []
+        return [restore(modified_text[start:end]) for start, end in self.find_chunk_bounds(modified_text)]
+
+    def find_chunk_bounds(self, text: str) -> List[Tuple[int, int]]:
+        """(start, end) offsets of each chunk of the placeholder-substituted text.
+
+        Works only on integer offsets into precomputed, sorted index lists, so
+        split_text just slices and restores.
+        """
+        bounds = []
         start = 0
-        text_len = len(modified_text)
+        text_len = len(text)
+
+        # Index sentence endings and placeholder markers once, so each chunk
+        # looks its split point up by bisection instead of scanning characters
+        boundaries = [
+            m.start() for m in SENTENCE_END_RE.finditer(text)
+            if text[m.start()-1:m.start()+1] != '..'
+        ]
+        placeholder_starts = [m.start() for m in PLACEHOLDER_START_RE.finditer(text)]
+        underscore_pairs = [m.start() for m in DOUBLE_UNDERSCORE_RE.finditer(text)]
+        spans = [m.span() for m in PLACEHOLDER_RE.finditer(text)]
+        span_starts = [s for s, _ in spans]
+        n_boundaries = len(boundaries)
+        n_placeholders = len(placeholder_starts)
+        n_underscores = len(underscore_pairs)
+
+        def near_placeholder(i: int) -> bool:
+            # '__LATEX_' within the 50 chars before i and '__' within the 50 from i
+            j = bisect_left(placeholder_starts, max(0, i - 50))
+            if j == n_placeholders or placeholder_starts[j] + 8 > i:
+                return False
+            k = bisect_left(underscore_pairs, i)
+            return k < n_underscores and underscore_pairs[k] + 2 <= min(text_len, i + 50)
+
+        def outside_placeholder(i: int, chunk_start: int) -> int:
+            # A cut strictly inside a placeholder would leak half of it into each
+            # chunk; move it before the placeholder, or after it if that would
+            # leave the chunk empty
+            p = bisect_right(span_starts, i - 1) - 1
+            if p < 0 or not spans[p][0] < i < spans[p][1]:
+                return i
+            return spans[p][0] if spans[p][0] > chunk_start else spans[p][1]
 
         while start < text_len:
             end = start + self.chunk_size
 
             if end >= text_len:
-                chunks.append(modified_text[start:])
+                bounds.append((start, text_len))
                 break
 
             # Find a good split point (prefer sentence endings)
             split_point = end
-            for i in range(max(start, end - 100), min(end + 100, text_len)):
-                if modified_text[i] in '.!?\n' and not modified_text[i-1:i+1] == '..':
-                    # Check if we're inside a placeholder
-                    before_char = modified_text[max(0, i-50):i]
-                    after_char = modified_text[i:min(text_len, i+50)]
-
-                    # Make sure we're not splitting inside a placeholder
-                    if not ('__LATEX_' in before_char and '__' in after_char):
-                        split_point = i + 1
-                        break
-
-            chunk = modified_text[start:split_point]
-
-            # Restore LaTeX expressions in chunk
-            for placeholder, latex in placeholders.items():
-                chunk = chunk.replace(placeholder, latex)
-
-            chunks.append(chunk)
+            window_end = min(end + 100, text_len)
+            b = bisect_left(boundaries, max(start, end - 100))
+            while b < n_boundaries and boundaries[b] < window_end:
+                # Make sure we're not splitting inside a placeholder
+                if not near_placeholder(boundaries[b]):
+                    split_point = boundaries[b] + 1
+                    break
+                b += 1
+
+            split_point = outside_placeholder(split_point, start)
+            bounds.append((start, split_point))
 
             # Move start position with overlap
-            start = max(start + 1, split_point - self.chunk_overlap)
+            start = outside_placeholder(max(start + 1, split_point - self.chunk_overlap), start)
 
-        return chunks
+        return bounds
 
     def split_documents(self, documents):
         """Split documents using LaTeX-aware splitting"""
@@ -104,10 +176,12 @@ class LaTeXAwareTextSplitter:
 class DocumentProcessor:
     """Service for processing documents and adding them to vector store"""
     
-    def __init__(self, settings, vector_store_service, db_session):
+    def __init__(self, settings, vector_store_service, session_factory):
         self.settings = settings
         self.vector_store_service = vector_store_service
-        self.db = db_session
+        # Processing runs as a background job after the request's session is
+        # gone, so each job opens its own session from this factory
+        self.session_factory = session_factory
 
         # Initialize LaTeX-aware text splitter
         self.text_splitter = LaTeXAwareTextSplitter(
@@ -115,12 +189,13 @@ class DocumentProcessor:
             chunk_overlap=self.settings.CHUNK_OVERLAP
         )
     
-    def load_document(self, file_path: str) -> List:
+    async def load_document(self, file_path: str, content: Optional[bytes] = None) -> List:
         """
         Load document based on file type
         
         Args:
             file_path: Path to the document
+            content: File bytes already in memory (only used for INLINE_EXTENSIONS)
         
         Returns:
             List of loaded documents
@@ -128,6 +203,19 @@ class DocumentProcessor:
         file_extension = Path(file_path).suffix.lower()
         
         try:
+            if content is not None and file_extension in self.INLINE_EXTENSIONS:
+                # Same result as TextLoader (newlines included), without reading the file back
+                from langchain_core.documents import Document
+                documents = [Document(page_content=decode_text(content), metadata={"source": file_path})]
+                logger.info(f"Loaded {file_path} from memory")
+                return documents
+            
+            if file_extension in self.INLINE_EXTENSIONS and os.path.getsize(file_path) > self.settings.INLINE_UPLOAD_THRESHOLD:
+                # Too large to have been kept in memory by the upload
+                documents = await asyncio.to_thread(load_text_mmap, file_path)
+                logger.info(f"Loaded {file_path} via mmap")
+                return documents
+            
             if file_extension == '.pdf':
                 loader = PyPDFLoader(file_path)
             elif file_extension == '.txt':
@@ -138,7 +226,8 @@ class DocumentProcessor:
                 # Fallback to unstructured loader
                 loader = UnstructuredFileLoader(file_path)
             
-            documents = loader.load()
+            # Parsing (PDF especially) can take seconds; keep it off the event loop
+            documents = await asyncio.to_thread(loader.load)
             logger.info(f"Loaded {len(documents)} pages from {file_path}")
             return documents
             
@@ -168,7 +257,8 @@ class DocumentProcessor:
         self,
         document_id: int,
         file_path: str,
-        collection_name: str
+        collection_name: str,
+        content: Optional[bytes] = None
     ):
         """
         Process a document: load, split, and add to vector store
@@ -177,116 +267,123 @@ class DocumentProcessor:
             document_id: Database ID of the document
             file_path: Path to the document file
             collection_name: Name of the collection to add to
+            content: File bytes kept from the upload, if any
         """
         from app.infra import Document
         from sqlalchemy import select
         
-        try:
-            # Update status to processing
-            result = await self.db.execute(select(Document).where(Document.id == document_id))
-            document = result.scalar_one_or_none()
-            if not document:
-                logger.error(f"Document {document_id} not found")
-                return
+        async with self.session_factory() as db:
+            try:
+                # Update status to processing
+                result = await db.execute(select(Document).where(Document.id == document_id))
+                document = result.scalar_one_or_none()
+                if not document:
+                    logger.error(f"Document {document_id} not found")
+                    return
             
-            document.status = "processing"
-            await self.db.commit()
+                document.status = "processing"
+                await db.commit()
             
-            # Load document
-            loaded_docs = self.load_document(file_path)
+                # Load document
+                loaded_docs = await self.load_document(file_path, content)
             
-            # Split into chunks
-            chunks = self.split_documents(loaded_docs)
+                # Split into chunks
+                chunks = self.split_documents(loaded_docs)
             
-            # Prepare texts and metadatas
-            texts = [chunk.page_content for chunk in chunks]
-            metadatas = []
+                # Prepare texts and metadatas
+                texts = [chunk.page_content for chunk in chunks]
+                metadatas = []
             
-            for i, chunk in enumerate(chunks):
-                # Create title from filename (remove extension and clean up)
-                title = Path(document.filename).stem
-                if len(title) > 100:  # Truncate long titles
-                    title = title[:97] + "..."
-
-                # Create comprehensive metadata for different collection schemas
-                metadata = {
-                    # Core document fields
-                    "document_id": document_id,
-                    "filename": document.filename,
-                    "title": title,  # Required field for Milvus schema
-                    "subject": title,  # Alternative field name for compatibility
-                    "name": title,  # Another common field name
-
-                    # Chunk information
-                    "chunk_index": i,
-                    "total_chunks": len(chunks),
-                    "chunk_id": f"{document_id}_{i}",
-
-                    # Collection info
-                    "collection": collection_name,
-                    "collection_name": collection_name,
-
-                    # Content info
-                    "content_length": len(chunk.page_content),
-                    "has_content": len(chunk.page_content.strip()) > 0,
-
-                    # Document metadata
-                    "file_size": document.file_size,
-                    "file_type": document.file_type,
-
-                    # Author information (required by some collection schemas)
-                    "author": chunk.metadata.get('author', 'Unknown'),
-
-                    # Processing info
-                    "processed_at": document.created_at.isoformat() if document.created_at else None,
-
-                    # Include any additional metadata from the chunk
-                    **chunk.metadata
-                }
-
-                # Remove None values to avoid schema issues
-                metadata = {k: v for k, v in metadata.items() if v is not None}
-                metadatas.append(metadata)
+                for i, chunk in enumerate(chunks):
+                    # Create title from filename (remove extension and clean up)
+                    title = Path(document.filename).stem
+                    if len(title) > 100:  # Truncate long titles
+                        title = title[:97] + "..."
+
+                    # Create comprehensive metadata for different collection schemas
+                    metadata = {
+                        # Core document fields
+                        "document_id": document_id,
+                        "filename": document.filename,
+                        "title": title,  # Required field for Milvus schema
+                        "subject": title,  # Alternative field name for compatibility
+                        "name": title,  # Another common field name
+
+                        # Chunk information
+                        "chunk_index": i,
+                        "total_chunks": len(chunks),
+                        "chunk_id": f"{document_id}_{i}",
+
+                        # Collection info
+                        "collection": collection_name,
+                        "collection_name": collection_name,
+
+                        # Content info
+                        "content_length": len(chunk.page_content),
+                        "has_content": len(chunk.page_content.strip()) > 0,
+
+                        # Document metadata
+                        "file_size": document.file_size,
+                        "file_type": document.file_type,
+
+                        # Author information (required by some collection schemas)
+                        "author": chunk.metadata.get('author', 'Unknown'),
+
+                        # Processing info
+                        "processed_at": document.created_at.isoformat() if document.created_at else None,
+
+                        # Include any additional metadata from the chunk
+                        **chunk.metadata
+                    }
+
+                    # Remove None values to avoid schema issues
+                    metadata = {k: v for k, v in metadata.items() if v is not None}
+                    metadatas.append(metadata)
             
-            # Add to vector store in batches to avoid GPU memory issues
-            batch_size = 10  # Process in small batches
-            doc_ids = []
-
-            for i in range(0, len(texts), batch_size):
-                batch_texts = texts[i:i + batch_size]
-                batch_metadatas = metadatas[i:i + batch_size]
-
-                logger.info(f"Processing batch {i//batch_size + 1}/{(len(texts) + batch_size - 1)//batch_size} ({len(batch_texts)} chunks)")
-
-                batch_ids = self.vector_store_service.add_documents(
-                    collection_name=collection_name,
-                    texts=batch_texts,
-                    metadatas=batch_metadatas
+                # Add to vector store in batches sized for the embedding model.
+                # Calls block, so they run in threads; two in flight lets one
+                # batch embed while the previous one is inserted into Milvus.
+                batch_size = self.settings.EMBED_BATCH_SIZE
+                total_batches = (len(texts) + batch_size - 1) // batch_size
+                in_flight = asyncio.Semaphore(2)
+
+                async def add_batch(i: int) -> List[str]:
+                    async with in_flight:
+                        logger.info(f"Processing batch {i//batch_size + 1}/{total_batches} ({len(texts[i:i + batch_size])} chunks)")
+                        return await asyncio.to_thread(
+                            self.vector_store_service.add_documents,
+                            collection_name=collection_name,
+                            texts=texts[i:i + batch_size],
+                            metadatas=metadatas[i:i + batch_size]
+                        )
+
+                batch_results = await asyncio.gather(
+                    *(add_batch(i) for i in range(0, len(texts), batch_size))
                 )
-                doc_ids.extend(batch_ids)
+                doc_ids = [doc_id for batch_ids in batch_results for doc_id in batch_ids]
             
-            # Update document status
-            document.status = "completed"
-            document.chunk_count = len(chunks)
-            document.processed_at = datetime.utcnow()
-            document.doc_metadata = {
-                "vector_ids": doc_ids,
-                "total_chunks": len(chunks)
-            }
-            await self.db.commit()
+                # Update document status
+                document.status = "completed"
+                document.chunk_count = len(chunks)
+                document.processed_at = datetime.utcnow()
+                document.doc_metadata = {
+                    "vector_ids": doc_ids,
+                    "total_chunks": len(chunks)
+                }
+                await db.commit()
             
-            logger.info(f"Successfully processed document {document_id}")
+                logger.info(f"Successfully processed document {document_id}")
             
-        except Exception as e:
-            logger.error(f"Failed to process document {document_id}: {e}")
+            except Exception as e:
+                logger.error(f"Failed to process document {document_id}: {e}")
             
-            # Update status to failed
-            result = await self.db.execute(select(Document).where(Document.id == document_id))
-            document = result.scalar_one_or_none()
-            if document:
-                document.status = "failed"
-                document.error_message = str(e)
-                await self.db.commit()
+                # Update status to failed
+                result = await db.execute(select(Document).where(Document.id == document_id))
+                document = result.scalar_one_or_none()
+                if document:
+                    document.status = "failed"
+                    document.error_message = str(e)
+                    await db.commit()
     
     async def batch_process_documents(
         self,
@@ -303,12 +400,26 @@ class DocumentProcessor:
         from app.infra import Document
         from sqlalchemy import select
         
-        for doc_id in document_ids:
-            result = await self.db.execute(select(Document).where(Document.id == doc_id))
-            document = result.scalar_one_or_none()
-            if document:
-                await self.process_document(doc_id, document.file_path, collection_name)
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(Document.id, Document.file_path).where(Document.id.in_(document_ids))
+            )
+            file_paths = dict(result.all())
+        
+        # Bounded, so loading/splitting one document overlaps embedding another
+        # without exhausting threads, GPU memory or DB connections
+        semaphore = asyncio.Semaphore(self.settings.INGEST_CONCURRENCY)
+
+        async def process_one(doc_id: int):
+            async with semaphore:
+                await self.process_document(doc_id, file_paths[doc_id], collection_name)
+
+        await asyncio.gather(*(process_one(doc_id) for doc_id in document_ids if doc_id in file_paths))
     
+    SUPPORTED_EXTENSIONS = ('.pdf', '.txt', '.docx', '.doc', '.md', '.html', '.json')
+    # Types whose loader only needs the raw bytes, so uploads can skip the disk re-read
+    INLINE_EXTENSIONS = ('.txt',)
+
     def get_supported_extensions(self) -> List[str]:
         """Get list of supported file extensions"""
-        return ['.pdf', '.txt', '.docx', '.doc', '.md', '.html', '.json']
+        return list(self.SUPPORTED_EXTENSIONS)
@@ -9,6 +9,8 @@ from app.services.llm_service import LLMService
 from app.services.rag_service import RAGService
 from app.services.speech_service import SpeechService
 from app.services.chat_service import ChatService
+from app.services.document_processor import DocumentProcessor
+from app.infra.database import AsyncSessionLocal
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,7 +22,8 @@ _initialized = {
     'llm': False,
     'rag': False,
     'speech': False,
-    'chat': False
+    'chat': False,
+    'document_processor': False
 }
 
 @lru_cache(maxsize=1)
@@ -77,6 +80,15 @@ def get_chat_service() -> ChatService:
     llm_service = get_llm_service()
     return ChatService(rag_service, speech_service, llm_service)
 
+@lru_cache(maxsize=1)
+def get_document_processor() -> DocumentProcessor:
+    """Get singleton DocumentProcessor instance"""
+    if not _initialized['document_processor']:
+        logger.info("Initializing DocumentProcessor (singleton)")
+        _initialized['document_processor'] = True
+    vector_store_service = get_vector_store_service()
+    return DocumentProcessor(settings, vector_store_service, AsyncSessionLocal)
+
 def reset_services():
     """Reset all service instances (useful for testing)"""
     global _initialized
@@ -87,4 +99,5 @@ def reset_services():
     get_rag_service.cache_clear()
     get_speech_service.cache_clear()
     get_chat_service.cache_clear()
+    get_document_processor.cache_clear()
     logger.info("All service caches cleared")
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Script to create a fresh PostgreSQL database with the complete schema.
-This consolidates all migrations into a single database creation script.
+Runs the Alembic migrations to head, so the result matches a migrated
+database (partitioned messages table, GIN indexes, alembic_version stamp).
 """
 import asyncio
 import sys
@@ -11,7 +12,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.infra.database import engine
-from app.infra import Base
+from app.infra.migrations import run_migrations_async
 from sqlalchemy import text
 import logging
 
@@ -19,21 +20,15 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 async def create_fresh_database():
-    """Create all tables from scratch using SQLAlchemy models."""
+    """Create all tables from scratch by running the migrations to head."""
 
     logger.info("🗃️  Creating fresh PostgreSQL database...")
 
-    # Ensure we have an async context by creating and immediately closing a session
-    # This prevents "greenlet_spawn has not been called" errors
-    from app.infra.database import AsyncSessionLocal
-    async with AsyncSessionLocal() as dummy_session:
-        pass  # Just create and close to establish async context
-
     try:
-        # Create tables using SQLAlchemy metadata (handles async properly)
-        logger.info("📋 Creating tables from SQLAlchemy models...")
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+        # Base.metadata.create_all would skip the partitioning and indexes
+        # that only the migrations define
+        logger.info("📋 Running alembic upgrade head...")
+        await run_migrations_async()
 
         logger.info("✅ Database schema created successfully!")
 
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Script to rebuild every collection's document_count from the documents table
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.infra.database import AsyncSessionLocal, engine
+from app.infra.collection import recount_document_counts
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def recount_all_collections():
+    """Recount documents for all collections"""
+    logger.info("🔢 Recounting documents for all collections...")
+    try:
+        async with AsyncSessionLocal() as db:
+            await recount_document_counts(db)
+            await db.commit()
+        logger.info("✅ Document counts rebuilt")
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(recount_all_collections())
@@ -1,6 +1,7 @@
+import uuid
 import pytest
 import pytest_asyncio
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
@@ -31,6 +32,8 @@ async def test_db_setup():
     yield
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+    # Close the pooled aiosqlite connection so its worker thread exits
+    await engine.dispose()
 
 @pytest_asyncio.fixture
 async def db_session(test_db_setup):
@@ -42,17 +45,24 @@ async def db_session(test_db_setup):
 def mock_redis():
     """Mock Redis client to avoid external dependency."""
     mock = AsyncMock()
+    mock.get = AsyncMock(return_value=None)
     mock.setex = AsyncMock()
     mock.exists = AsyncMock(return_value=1)
     mock.delete = AsyncMock()
+    mock.evalsha = AsyncMock(return_value=1)
+    # Pipelines queue commands synchronously and run them on execute()
+    pipeline = MagicMock()
+    pipeline.execute = AsyncMock(return_value=[1, None])
+    mock.pipeline = MagicMock(return_value=pipeline)
     return mock
 
 @pytest_asyncio.fixture
 async def client(db_session, mock_redis, monkeypatch):
     """Create async httpx test client with overridden dependencies."""
     
-    # Mock the redis_client at module level
+    # Mock the redis clients at module level
     monkeypatch.setattr(redis_module, "redis_client", mock_redis)
+    monkeypatch.setattr(redis_module, "auth_redis", mock_redis)
     
     async def override_get_db():
         yield db_session
@@ -64,4 +74,13 @@ async def client(db_session, mock_redis, monkeypatch):
         yield ac
 
     # Clean up
-    app.dependency_overrides.clear()
\ No newline at end of file
+    app.dependency_overrides.clear()
+
+@pytest_asyncio.fixture
+async def auth_headers(client):
+    """Register a fresh user and return its bearer Authorization header."""
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={"email": f"user-{uuid.uuid4().hex[:12]}@example.com", "password": "pass"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
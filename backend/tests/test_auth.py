@@ -1,6 +1,74 @@
+import asyncio
 import pytest
 from jose import jwt
 from app.core.config import settings
+import app.infra.redis as redis_module
+
+
+class FakeAuthRedis:
+    """In-memory stand-in for the auth Redis client that keeps key state.
+
+    Implements just what the refresh-token paths use, including the rotate
+    script's consume-then-store semantics.
+    """
+
+    def __init__(self):
+        self.store = {}
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def exists(self, key):
+        return int(key in self.store)
+
+    async def delete(self, key):
+        return int(self.store.pop(key, None) is not None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def evalsha(self, sha, numkeys, old_key, new_key, ttl):
+        assert sha == redis_module.ROTATE_REFRESH_TOKEN_SHA
+        self.commands.append(("rotate", old_key, new_key))
+
+    def get(self, key):
+        self.commands.append(("get", key))
+
+    async def execute(self, raise_on_error=True):
+        results = []
+        for command, *args in self.commands:
+            if command == "rotate":
+                old_key, new_key = args
+                if self.redis.store.pop(old_key, None) is not None:
+                    self.redis.store[new_key] = b"valid"
+                    results.append(1)
+                else:
+                    results.append(0)
+            else:
+                results.append(self.redis.store.get(args[0]))
+        return results
+
+
+@pytest.fixture
+def auth_redis(client, monkeypatch):
+    fake = FakeAuthRedis()
+    monkeypatch.setattr(redis_module, "auth_redis", fake)
+    return fake
+
+
+async def _login_refresh_token(client, email):
+    await client.post("/api/v1/auth/register", json={"email": email, "password": "pass"})
+    response = await client.post("/api/v1/auth/login", json={"email": email, "password": "pass"})
+    return response.json()["refresh_token"]
 
 @pytest.mark.asyncio
 async def test_health_check(client):
@@ -116,4 +184,31 @@ async def test_access_token_decoding(client):
         algorithms=[settings.algorithm]
     )
     assert payload["type"] == "access"
-    assert "exp" in payload
\ No newline at end of file
+    assert "exp" in payload
+
+@pytest.mark.asyncio
+async def test_refresh_token_cannot_be_replayed(client, auth_redis):
+    refresh_token = await _login_refresh_token(client, "replay@example.com")
+
+    first = await client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+    assert first.status_code == 200
+
+    replay = await client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+    assert replay.status_code == 401
+    assert "revoked or expired" in replay.json()["detail"]
+
+    # The rotated token is the one that now works
+    rotated = await client.post(
+        "/api/v1/auth/refresh", json={"refresh_token": first.json()["refresh_token"]}
+    )
+    assert rotated.status_code == 200
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_only_one_succeeds(client, auth_redis):
+    refresh_token = await _login_refresh_token(client, "concurrent@example.com")
+
+    responses = await asyncio.gather(*(
+        client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+        for _ in range(3)
+    ))
+    assert sorted(r.status_code for r in responses) == [200, 401, 401]
@@ -0,0 +1,41 @@
+import pytest
+from unittest.mock import MagicMock
+
+from app.main import app
+from app.infra.concurrency import DB_SEMAPHORE
+from app.services.chat_service import ChatService
+from app.services.service_manager import get_chat_service
+
+
+@pytest.mark.asyncio
+async def test_send_message_holds_no_transaction_during_rag_call(client, auth_headers, db_session):
+    idle_slots = DB_SEMAPHORE._value
+    seen = {}
+
+    async def chat(**kwargs):
+        seen["in_transaction"] = db_session.in_transaction()
+        seen["free_slots"] = DB_SEMAPHORE._value
+        return {"answer": "It is blue.", "sources": [{"source": "sky.txt"}], "llm_used": "fake"}
+
+    rag_service = MagicMock()
+    rag_service.chat = chat
+    app.dependency_overrides[get_chat_service] = lambda: ChatService(rag_service, MagicMock(), MagicMock())
+
+    collection = await client.post("/api/v1/collections/", json={"name": "sky"}, headers=auth_headers)
+    session = await client.post(
+        "/api/v1/chat/sessions", json={"collection_id": collection.json()["id"]}, headers=auth_headers
+    )
+    session_id = session.json()["id"]
+
+    response = await client.post(
+        "/api/v1/chat/send",
+        json={"session_id": session_id, "message": "What colour is the sky?"},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["content"] == "It is blue."
+    assert seen == {"in_transaction": False, "free_slots": idle_slots}
+
+    messages = await client.get(f"/api/v1/chat/sessions/{session_id}/messages", headers=auth_headers)
+    assert [m["role"] for m in messages.json()] == ["user", "assistant"]
+    assert messages.json()[0]["sources"] is None
@@ -0,0 +1,37 @@
+import pytest
+from unittest.mock import MagicMock
+from langchain_community.document_loaders import TextLoader
+
+from app.core.config import settings
+from app.services.document_processor import DocumentProcessor
+
+TEXT = b"first line\r\nsecond line\rthird line\nlast \xc3\xa9"
+
+
+@pytest.fixture
+def processor():
+    return DocumentProcessor(settings, MagicMock(), MagicMock())
+
+
+@pytest.fixture
+def text_file(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_bytes(TEXT)
+    return str(path)
+
+
+@pytest.mark.asyncio
+async def test_inline_text_matches_text_loader(processor, text_file):
+    expected = TextLoader(text_file, encoding="utf-8").load()[0].page_content
+    documents = await processor.load_document(text_file, content=TEXT)
+    assert documents[0].page_content == expected == "first line\nsecond line\nthird line\nlast é"
+
+
+@pytest.mark.asyncio
+async def test_mmap_text_matches_inline_and_text_loader(processor, text_file, monkeypatch):
+    # Above the threshold the file is read back through the memory map
+    monkeypatch.setattr(settings, "INLINE_UPLOAD_THRESHOLD", 1)
+    expected = TextLoader(text_file, encoding="utf-8").load()[0].page_content
+    mapped = await processor.load_document(text_file)
+    inline = await processor.load_document(text_file, content=TEXT)
+    assert mapped[0].page_content == inline[0].page_content == expected
@@ -0,0 +1,60 @@
+from app.services.document_processor import LaTeXAwareTextSplitter
+
+
+def test_inline_math_is_kept_whole_and_restored():
+    splitter = LaTeXAwareTextSplitter(chunk_size=40, chunk_overlap=0)
+    text = "Intro words here. Energy is $E = mc^2$ and more text follows after it. End."
+    assert splitter.split_text(text) == [
+        "Intro words here.",
+        " Energy is $E = mc^2$ and more text follows after it.",
+        " End.",
+    ]
+
+
+def test_display_and_environment_math_are_not_split_on_their_punctuation():
+    splitter = LaTeXAwareTextSplitter(chunk_size=30, chunk_overlap=0)
+    text = (
+        "Display math follows. $$\\sum_{i=1}^n i = \\frac{n(n+1)}{2}$$ Then an environment. "
+        "\\begin{equation}\na. b! c?\n\\end{equation} Inline $x.y$ and \\[z\\] close it."
+    )
+    assert splitter.split_text(text) == [
+        "Display math follows.",
+        " $$\\sum_{i=1}^n i = \\frac{n(n+1)}{2}$$ Then",
+        " an environment. \\begin{equation}\na. b! c?\n\\end{equation} Inline $x.y$ and \\[z\\] close it.",
+    ]
+
+
+def test_inline_math_nested_in_paren_math_round_trips():
+    splitter = LaTeXAwareTextSplitter()
+    text = "Short. \\( $a$ + b \\) done."
+    assert splitter.split_text(text) == [text]
+
+
+def test_chunk_boundary_inside_placeholder_moves_before_it():
+    splitter = LaTeXAwareTextSplitter(chunk_size=40, chunk_overlap=0)
+    text = "aaaa " * 6 + "$x_1 + x_2 + x_3 + x_4$" + " bbbb" * 10
+    assert splitter.split_text(text) == [
+        "aaaa aaaa aaaa aaaa aaaa aaaa ",
+        "$x_1 + x_2 + x_3 + x_4$ bbbb bbbb bbbb b",
+        "bbb bbbb bbbb bbbb bbbb bbbb bbbb",
+    ]
+
+
+def test_overlap_never_starts_inside_placeholder():
+    splitter = LaTeXAwareTextSplitter(chunk_size=40, chunk_overlap=12)
+    text = "aaaa " * 6 + "$x_1 + x_2 + x_3 + x_4$" + " bbbb" * 10
+    chunks = splitter.split_text(text)
+    assert chunks == [
+        "aaaa aaaa aaaa aaaa aaaa aaaa ",
+        "a aaaa aaaa $x_1 + x_2 + x_3 + x_4$ bbbb",
+        "$x_1 + x_2 + x_3 + x_4$ bbbb bbbb bbbb b",
+        " bbbb bbbb bbbb bbbb bbbb bbbb bbbb bbbb",
+        "bb bbbb bbbb bbbb",
+    ]
+    assert not any("__" in chunk for chunk in chunks)
+
+
+def test_placeholder_longer_than_chunk_is_kept_whole():
+    splitter = LaTeXAwareTextSplitter(chunk_size=10, chunk_overlap=0)
+    math = "$$" + "x + " * 20 + "y$$"
+    assert splitter.split_text(math + " tail") == [math, " tail"]
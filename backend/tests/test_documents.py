@@ -0,0 +1,106 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.main import app
+from app.core.config import settings
+from app.services.service_manager import get_document_processor, get_vector_store_service
+
+UPLOAD_URL = "/api/v1/documents/upload"
+
+
+@pytest.fixture
+def doc_services(tmp_path, monkeypatch):
+    """Stub out document processing and Milvus, and upload into tmp_path."""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    processor = MagicMock()
+    processor.get_supported_extensions = MagicMock(return_value=[".txt"])
+    processor.INLINE_EXTENSIONS = (".txt",)
+    processor.process_document = AsyncMock()
+    vector_store = MagicMock()
+    app.dependency_overrides[get_document_processor] = lambda: processor
+    app.dependency_overrides[get_vector_store_service] = lambda: vector_store
+    return processor, vector_store
+
+
+async def _collection(client, headers, name):
+    response = await client.get("/api/v1/collections/", headers=headers)
+    return next(c for c in response.json() if c["name"] == name)
+
+
+@pytest.mark.asyncio
+async def test_document_count_tracks_upload_and_delete(client, auth_headers, doc_services):
+    files = [
+        ("files", ("a.txt", b"alpha", "text/plain")),
+        ("files", ("b.txt", b"beta", "text/plain")),
+    ]
+    response = await client.post(
+        UPLOAD_URL, params={"collection_name": "notes"}, files=files, headers=auth_headers
+    )
+    assert response.status_code == 200
+    document_ids = response.json()["document_ids"]
+    assert (await _collection(client, auth_headers, "notes"))["document_count"] == 2
+
+    response = await client.delete(f"/api/v1/documents/{document_ids[0]}", headers=auth_headers)
+    assert response.status_code == 200
+    assert (await _collection(client, auth_headers, "notes"))["document_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_recount_rebuilds_document_count(client, auth_headers, doc_services, db_session):
+    from sqlalchemy import update
+    from app.infra import Collection
+
+    await client.post(
+        UPLOAD_URL,
+        params={"collection_name": "drifted"},
+        files=[("files", ("a.txt", b"alpha", "text/plain"))],
+        headers=auth_headers
+    )
+    collection = await _collection(client, auth_headers, "drifted")
+    await db_session.execute(
+        update(Collection).where(Collection.id == collection["id"]).values(document_count=42)
+    )
+    await db_session.commit()
+
+    response = await client.post(
+        f"/api/v1/collections/{collection['id']}/recount", headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["document_count"] == 1
+    assert (await _collection(client, auth_headers, "drifted"))["document_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_upload_removes_files_already_written(client, auth_headers, doc_services, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", 8)
+    files = [
+        ("files", ("small.txt", b"ok", "text/plain")),
+        ("files", ("big.txt", b"x" * 64, "text/plain")),
+    ]
+    response = await client.post(
+        UPLOAD_URL, params={"collection_name": "oversize"}, files=files, headers=auth_headers
+    )
+    assert response.status_code == 400
+    assert [p for p in tmp_path.rglob("*") if p.is_file()] == []
+
+    response = await client.get(
+        "/api/v1/documents/list", params={"collection_name": "oversize"}, headers=auth_headers
+    )
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_list_documents_pages_with_cursor(client, auth_headers, doc_services):
+    files = [("files", (f"{name}.txt", b"text", "text/plain")) for name in ("a", "b", "c")]
+    response = await client.post(
+        UPLOAD_URL, params={"collection_name": "paged"}, files=files, headers=auth_headers
+    )
+    document_ids = sorted(response.json()["document_ids"], reverse=True)
+
+    params = {"collection_name": "paged", "limit": 2}
+    first = (await client.get("/api/v1/documents/list", params=params, headers=auth_headers)).json()
+    assert [d["id"] for d in first] == document_ids[:2]
+
+    params["cursor"] = first[-1]["id"]
+    second = (await client.get("/api/v1/documents/list", params=params, headers=auth_headers)).json()
+    assert [d["id"] for d in second] == document_ids[2:]
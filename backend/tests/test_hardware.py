@@ -0,0 +1,11 @@
+from app.core.hardware import get_hardware_info
+
+
+def test_hardware_info_callers_get_independent_copies():
+    info = get_hardware_info()
+    info["gpu_available"] = "mutated"
+    info["gpu_names"].append("mutated")
+
+    fresh = get_hardware_info()
+    assert fresh["gpu_available"] != "mutated"
+    assert "mutated" not in fresh["gpu_names"]
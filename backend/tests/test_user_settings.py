@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.api.v1 import user_settings as user_settings_api
+from app.infra import UserSettings
+
+SETTINGS_URL = "/api/v1/settings/ai-settings"
+
+CUSTOM_SETTINGS = {
+    "llm_model": "openai",
+    "embedding_model": "text-embedding-3-large",
+    "temperature": 12,
+    "max_tokens": 4000,
+    "top_k": 8,
+}
+
+@pytest.mark.asyncio
+async def test_get_settings_defaults(client, auth_headers):
+    response = await client.get(SETTINGS_URL, headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    for field, value in user_settings_api.DEFAULT_AI_SETTINGS.items():
+        assert data[field] == value
+
+@pytest.mark.asyncio
+async def test_update_settings_upserts_one_row(client, auth_headers, db_session):
+    response = await client.put(SETTINGS_URL, json=CUSTOM_SETTINGS, headers=auth_headers)
+    assert response.status_code == 200
+    user_id = response.json()["user_id"]
+
+    # Second write takes the ON CONFLICT DO UPDATE path
+    updated = {**CUSTOM_SETTINGS, "temperature": 3, "top_k": 2}
+    response = await client.put(SETTINGS_URL, json=updated, headers=auth_headers)
+    assert response.status_code == 200
+
+    count = await db_session.scalar(
+        select(func.count()).select_from(UserSettings).where(UserSettings.user_id == user_id)
+    )
+    assert count == 1
+    row = (await db_session.execute(
+        select(UserSettings.temperature, UserSettings.top_k).where(UserSettings.user_id == user_id)
+    )).one()
+    assert (row.temperature, row.top_k) == (3, 2)
+
+@pytest.mark.asyncio
+async def test_update_settings_refreshes_cache(client, auth_headers):
+    # Populate the per-worker cache with the defaults
+    response = await client.get(SETTINGS_URL, headers=auth_headers)
+    user_id = response.json()["user_id"]
+    assert user_settings_api._settings_cache[user_id]["temperature"] == user_settings_api.DEFAULT_AI_SETTINGS["temperature"]
+
+    await client.put(SETTINGS_URL, json=CUSTOM_SETTINGS, headers=auth_headers)
+    assert user_settings_api._settings_cache[user_id] == CUSTOM_SETTINGS
+
+    response = await client.get(SETTINGS_URL, headers=auth_headers)
+    assert {field: response.json()[field] for field in CUSTOM_SETTINGS} == CUSTOM_SETTINGS
+
+@pytest.mark.asyncio
+async def test_settings_read_from_database_on_cache_miss(client, auth_headers):
+    response = await client.put(SETTINGS_URL, json=CUSTOM_SETTINGS, headers=auth_headers)
+    user_id = response.json()["user_id"]
+
+    # Another worker would have no cache entry; it must read the stored row
+    user_settings_api._settings_cache.pop(user_id, None)
+    response = await client.get(SETTINGS_URL, headers=auth_headers)
+    assert {field: response.json()[field] for field in CUSTOM_SETTINGS} == CUSTOM_SETTINGS
+
+@pytest.mark.asyncio
+async def test_reset_settings(client, auth_headers):
+    await client.put(SETTINGS_URL, json=CUSTOM_SETTINGS, headers=auth_headers)
+    response = await client.post(f"{SETTINGS_URL}/reset", headers=auth_headers)
+    assert response.status_code == 200
+
+    response = await client.get(SETTINGS_URL, headers=auth_headers)
+    for field, value in user_settings_api.DEFAULT_AI_SETTINGS.items():
+        assert response.json()[field] == value
@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from fastapi import HTTPException
+
+from app.api.v1 import weather
+
+WEATHER = {
+    "name": "Paris",
+    "sys": {"country": "FR", "sunrise": 0, "sunset": 0},
+    "main": {"temp": 18.0, "feels_like": 17.0, "temp_min": 15.0, "temp_max": 20.0, "humidity": 60, "pressure": 1012},
+    "weather": [{"description": "clear sky", "main": "Clear"}],
+    "wind": {"speed": 2.0},
+    "clouds": {"all": 0},
+    "timezone": 3600,
+}
+FORECAST = {"list": [{"dt_txt": "2026-01-01 12:00:00", "main": WEATHER["main"], "weather": WEATHER["weather"]}]}
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Fake OpenWeather that counts calls and holds them until released."""
+    monkeypatch.setattr(weather, "redis_client", AsyncMock(get=AsyncMock(return_value=None)))
+    monkeypatch.setattr(weather, "generate_ai_insights", AsyncMock(return_value={}))
+    weather._l1_cache.clear()
+
+    class Upstream:
+        def __init__(self):
+            self.calls = 0
+            self.fail = False
+            self.release = asyncio.Event()
+
+        async def fetch(self, city, country_code=None, endpoint="weather"):
+            if endpoint == "weather":
+                self.calls += 1
+            await self.release.wait()
+            if self.fail:
+                raise HTTPException(status_code=503, detail="Unable to reach weather service")
+            return WEATHER if endpoint == "weather" else FORECAST
+
+    fake = Upstream()
+    monkeypatch.setattr(weather, "fetch_openweather_data", fake.fetch)
+    yield fake
+    weather._l1_cache.clear()
+    assert not weather._inflight
+
+
+async def _get(city):
+    return await weather.get_current_weather(city=city, country_code=None)
+
+
+async def _release_after_callers_join(upstream):
+    await asyncio.sleep(0)
+    upstream.release.set()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_upstream_fetch(upstream):
+    # Case and whitespace variants normalize to the same key
+    results = await asyncio.gather(
+        _get("Paris"), _get("paris"), _get("  PARIS "), _get("Paris"),
+        _release_after_callers_join(upstream)
+    )
+    assert upstream.calls == 1
+    assert all(r["weather"]["city"] == "Paris" for r in results[:4])
+
+    # Served from the in-process cache afterwards, without touching Redis
+    redis_reads = weather.redis_client.get.await_count
+    await _get("Paris")
+    assert upstream.calls == 1
+    assert weather.redis_client.get.await_count == redis_reads
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_does_not_poison_later_requests(upstream):
+    upstream.fail = True
+    results = await asyncio.gather(
+        _get("Paris"), _get("Paris"), _get("Paris"),
+        _release_after_callers_join(upstream),
+        return_exceptions=True
+    )
+    assert upstream.calls == 1
+    assert all(isinstance(r, HTTPException) and r.status_code == 503 for r in results[:3])
+    assert "weather:paris:" not in weather._l1_cache
+
+    # The failed flight is gone, so the next miss fetches again
+    upstream.fail = False
+    result = await _get("Paris")
+    assert upstream.calls == 2
+    assert result["weather"]["city"] == "Paris"